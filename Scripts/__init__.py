@@ -1 +1,15 @@
+"""
+The scripts here import their siblings (qmk_cache, keyboard_bounds, _accel)
+as top-level modules, which is what works when they are run from Scripts/.
+Put this directory on the path so those imports also resolve when a script
+is imported as part of the Scripts package (as Scripts/tests does). Every
+importer then shares one `_accel` module, which keeps Numba's on-disk kernel
+cache valid whichever way the kernels were first compiled.
+"""
 
+import os
+import sys
+
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.append(_SCRIPTS_DIR)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Compiled kernels for the keyboard image scripts.
+
+Numba is optional: without it the decorator below is a no-op and the kernels
+run as plain (slow, but correct) Python. flood_fill_bg is the exception: its
+per-pixel loop is several times slower interpreted than the list-based BFS
+it replaced, so without Numba that BFS is used instead.
+"""
+
+from collections import deque
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def flood_fill_bg(arr, bg_r, bg_g, bg_b, tol_sq, alpha):
+    """
+    Flood fill background from the image edges (8-connected).
+
+    `arr` is an (h, w, 3) uint8 RGB array. Pixels within sqrt(tol_sq) of the
+    background colour that are reachable from an edge get alpha 0; `alpha`
+    (h, w) uint8 is written in place and should start out at 255.
+    """
+    h, w = alpha.shape
+    visited = np.zeros(h * w, dtype=np.bool_)
+    # Each pixel is pushed at most once, so h*w slots always suffice
+    stack = np.empty(h * w, dtype=np.int32)
+    sp = 0
+
+    # Seed with every edge pixel
+    for x in range(w):
+        for y in (0, h - 1):
+            idx = y * w + x
+            if not visited[idx]:
+                visited[idx] = True
+                stack[sp] = idx
+                sp += 1
+    for y in range(h):
+        for x in (0, w - 1):
+            idx = y * w + x
+            if not visited[idx]:
+                visited[idx] = True
+                stack[sp] = idx
+                sp += 1
+
+    while sp > 0:
+        sp -= 1
+        idx = stack[sp]
+        y = idx // w
+        x = idx - y * w
+
+        dr = np.int32(arr[y, x, 0]) - bg_r
+        dg = np.int32(arr[y, x, 1]) - bg_g
+        db = np.int32(arr[y, x, 2]) - bg_b
+        if dr * dr + dg * dg + db * db > tol_sq:
+            continue
+        alpha[y, x] = 0
+
+        for dy in (-1, 0, 1):
+            ny = y + dy
+            if ny < 0 or ny >= h:
+                continue
+            for dx in (-1, 0, 1):
+                nx = x + dx
+                if nx < 0 or nx >= w:
+                    continue
+                nidx = ny * w + nx
+                if not visited[nidx]:
+                    visited[nidx] = True
+                    stack[sp] = nidx
+                    sp += 1
+
+
+def _flood_fill_bg_bfs(arr, bg_r, bg_g, bg_b, tol_sq, alpha):
+    """
+    flood_fill_bg without Numba: the same fill as a breadth-first search over
+    plain Python lists, with the background test vectorized up front.
+    """
+    h, w = alpha.shape
+    diff = arr[..., :3].astype(np.int32) - np.array([bg_r, bg_g, bg_b], dtype=np.int32)
+    is_bg = (np.einsum('...c,...c->...', diff, diff) <= tol_sq).ravel().tolist()
+    filled = bytearray(h * w)
+
+    # Seed with every background pixel on the edges
+    edges = set(range(w)) | set(range((h - 1) * w, h * w))
+    edges |= set(range(0, h * w, w)) | set(range(w - 1, h * w, w))
+    queue = deque(i for i in edges if is_bg[i])
+    for i in queue:
+        filled[i] = 1
+
+    while queue:
+        idx = queue.popleft()
+        y, x = divmod(idx, w)
+        for ny in (y - 1, y, y + 1):
+            if ny < 0 or ny >= h:
+                continue
+            for nx in (x - 1, x, x + 1):
+                if nx < 0 or nx >= w:
+                    continue
+                nidx = ny * w + nx
+                if is_bg[nidx] and not filled[nidx]:
+                    filled[nidx] = 1
+                    queue.append(nidx)
+
+    alpha[np.frombuffer(filled, dtype=np.bool_).reshape(h, w)] = 0
+
+
+if not HAVE_NUMBA:
+    flood_fill_bg = _flood_fill_bg_bfs
+
+
+@njit(cache=True)
+def bbox_scan(arr, threshold):
+    """
+    Bounding box of pixels darker than `threshold` in one pass.
+
+    `arr` is an (h, w, c) uint8 array: RGB(A), luma computed exactly as
+    Pillow's convert('L') does, or c == 1 for grayscale. Returns inclusive
+    (left, top, right, bottom), or (-1, -1, -1, -1) if there is no content.
+    Rows are scanned from each end until content is found, and within the
+    remaining rows only the pixels outside the current left/right bounds are
+    visited.
+    """
+    h, w, c = arr.shape
+
+    def dark(y, x):
+        if c == 1:
+            return arr[y, x, 0] < threshold
+        luma = (np.uint32(arr[y, x, 0]) * 19595 + np.uint32(arr[y, x, 1]) * 38470
+                + np.uint32(arr[y, x, 2]) * 7471 + 0x8000) >> 16
+        return luma < threshold
+
+    # First content row from the top, tracking its leftmost/rightmost pixel
+    top = -1
+    left = w
+    right = -1
+    for y in range(h):
+        for x in range(w):
+            if dark(y, x):
+                top = y
+                left = x
+                break
+        if top >= 0:
+            for x in range(w - 1, left - 1, -1):
+                if dark(y, x):
+                    right = x
+                    break
+            break
+    if top < 0:
+        return -1, -1, -1, -1
+
+    # Last content row from the bottom
+    bottom = top
+    for y in range(h - 1, top, -1):
+        found = False
+        for x in range(w):
+            if dark(y, x):
+                found = True
+                break
+        if found:
+            bottom = y
+            break
+
+    # Widen left/right using only the pixels outside the current bounds
+    for y in range(top, bottom + 1):
+        for x in range(left):
+            if dark(y, x):
+                left = x
+                break
+        for x in range(w - 1, right, -1):
+            if dark(y, x):
+                right = x
+                break
+
+    return left, top, right, bottom
@@ -6,10 +6,15 @@ This script scans Swift files for Button, Toggle, and Picker declarations
 and ensures they have .accessibilityIdentifier() modifiers.
 """
 
+import hashlib
+import json
+import os
 import re
 import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 # Colors for terminal output
 RED = "\033[0;31m"
@@ -19,11 +24,15 @@ NC = "\033[0m"  # No Color
 
 # Patterns for interactive UI elements
 INTERACTIVE_PATTERNS = [
-    (r"(?<![A-Za-z0-9_])Button\s*\(", "Button"),
-    (r"(?<![A-Za-z0-9_])Toggle\s*\(", "Toggle"),
-    (r"(?<![A-Za-z0-9_])Picker\s*\(", "Picker"),
+    (re.compile(r"(?<![A-Za-z0-9_])Button\s*\("), "Button"),
+    (re.compile(r"(?<![A-Za-z0-9_])Toggle\s*\("), "Toggle"),
+    (re.compile(r"(?<![A-Za-z0-9_])Picker\s*\("), "Picker"),
 ]
 
+# Results cache, relative to the project root. Keyed by a content hash of
+# each file, and discarded whenever this script itself changes.
+CACHE_FILE = Path(".cache") / "acc_check.json"
+
 # Files/directories to exclude
 EXCLUDED_PATTERNS = [
     r".*Test.*\.swift$",
@@ -35,111 +44,222 @@ EXCLUDED_PATTERNS = [
 ]
 
 # System components that don't need SwiftUI accessibility identifiers
+# (plain substrings, matched with bytes.find rather than regex)
 SYSTEM_COMPONENT_PATTERNS = [
-    r"NSButton",
-    r"NSToggle",
-    r"NSPopUpButton",
-    r"NSComboBox",
+    b"NSButton",
+    b"NSToggle",
+    b"NSPopUpButton",
+    b"NSComboBox",
+]
+
+# Literal prefix of the accessibilityIdentifier modifier
+ACC_ID_NEEDLE = b".accessibilityIdentifier"
+
+# NSAlert construction markers (plain substrings)
+NSALERT_MARKERS = [
+    b"alert.addButton",
+    b"NSAlert()",
+    b"let alert = NSAlert",
 ]
 
+# Compiled once at import; these run against every line of every Swift file.
+# The whole-file sweeps use bytes patterns and run directly on the raw file
+# contents, searching byte ranges instead of slicing out line strings.
+_EXCLUDED_RES = [re.compile(p) for p in EXCLUDED_PATTERNS]
+# All interactive patterns fused into one alternation, one named group each
+_INTERACTIVE_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern.pattern})" for pattern, name in INTERACTIVE_PATTERNS).encode()
+)
+_ELEMENT_ORDER = {name: order for order, (_, name) in enumerate(INTERACTIVE_PATTERNS)}
+_ACC_ID_RE = re.compile(rb"\.accessibilityIdentifier\s*\(")
+# Zero-width lookaheads so finditer reports every start offset, with the lazy
+# quantifier giving the earliest line on which each presentation can end.
+_ALERT_RE = re.compile(rb"(?=(\.alert\s*\([^)]*?isPresented:))")
+_SHEET_RE = re.compile(rb"(?=(\.(sheet|popover|fullScreenCover)\s*\([^)]*?isPresented:))")
+_CUSTOM_BUTTON_RE = re.compile(r"\b[A-Z][a-zA-Z0-9]*Button\s*\(")
+_CUSTOM_TOGGLE_RE = re.compile(r"\b[A-Z][a-zA-Z0-9]*Toggle\s*\(")
+_CUSTOM_PICKER_RE = re.compile(r"\b[A-Z][a-zA-Z0-9]*Picker\s*\(")
+_FUNC_DECL_RE = re.compile(r"\b(func|case\s+let)\b")
+_GUARD_RE = re.compile(r"guard\s+case\s+let\s+\.(tapHoldPicker|singleKeyPicker)")
+
 
 def is_excluded(file_path: Path) -> bool:
     """Check if file should be excluded from checking."""
     file_str = str(file_path)
-    for pattern in EXCLUDED_PATTERNS:
-        if re.search(pattern, file_str):
+    for pattern in _EXCLUDED_RES:
+        if pattern.search(file_str):
             return True
     return False
 
 
-def has_accessibility_identifier(lines: List[str], start_idx: int, end_idx: int) -> bool:
+def iter_swift_files(root: str) -> Iterator[str]:
+    """Recursively yield paths of .swift files under root.
+
+    Walks with os.scandir directly, which reuses the directory entry's
+    cached type info instead of creating and stat-ing a Path per entry.
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_swift_files(entry.path)
+            elif entry.name.endswith(".swift"):
+                yield entry.path
+
+
+def line_end(data: bytes, line_starts: List[int], idx: int) -> int:
+    """Offset just past line idx, excluding its newline."""
+    return line_starts[idx + 1] - 1 if idx + 1 < len(line_starts) else len(data)
+
+
+def has_accessibility_identifier(
+    data: bytes, line_starts: List[int], start_idx: int, end_idx: int
+) -> bool:
     """Check if code block has accessibilityIdentifier modifier."""
-    block = "\n".join(lines[start_idx:end_idx])
-    
-    # Check for accessibilityIdentifier modifier
-    if re.search(r"\.accessibilityIdentifier\s*\(", block):
+    start = line_starts[start_idx]
+    end = line_end(data, line_starts, end_idx - 1)
+
+    # Check for accessibilityIdentifier modifier; the plain substring
+    # test rules out most blocks before the regex runs
+    if data.find(ACC_ID_NEEDLE, start, end) != -1 and _ACC_ID_RE.search(data, start, end):
         return True
-    
+
     # Check if it's a system component (uses different accessibility APIs)
-    for pattern in SYSTEM_COMPONENT_PATTERNS:
-        if re.search(pattern, block):
-            return True
-    
-    return False
+    return any(data.find(marker, start, end) != -1 for marker in SYSTEM_COMPONENT_PATTERNS)
+
+
+def find_presented_lines(data: bytes, line_starts: List[int], window: int = 20) -> List[bool]:
+    """Flag lines that sit within `window` lines after an alert/sheet presentation.
+
+    A line is flagged when a whole `.alert(... isPresented:` (or sheet/popover/
+    fullScreenCover) match lies in the `window` lines ending at that line.
+    """
+    line_count = len(line_starts)
+    presented = [False] * line_count
+    for pattern in (_ALERT_RE, _SHEET_RE):
+        for match in pattern.finditer(data):
+            first = bisect_right(line_starts, match.start(1)) - 1
+            last = bisect_right(line_starts, match.end(1) - 1) - 1
+            for idx in range(last, min(first + window, line_count)):
+                presented[idx] = True
+    return presented
 
 
 def find_interactive_elements(file_path: Path) -> List[Tuple[int, str, str]]:
     """Find all interactive UI elements in a Swift file."""
     try:
-        content = file_path.read_text(encoding="utf-8")
+        data = file_path.read_bytes()
+        if not data.isascii():
+            data.decode("utf-8")  # Validate only; matching works on bytes
     except Exception as e:
         print(f"Warning: Could not read {file_path}: {e}", file=sys.stderr)
         return []
-    
-    lines = content.split("\n")
+
+    line_starts = [0]
+    line_starts.extend(m.end() for m in re.finditer(b"\n", data))
     issues = []
-    
-    for line_idx, line in enumerate(lines, start=1):
-        # Check if this button is inside an alert closure
-        # Look backwards for .alert( pattern
-        context_start = max(0, line_idx - 20)
-        context = "\n".join(lines[context_start:line_idx])
-        
-        # Skip if inside alert closure (buttons in alerts are system-managed)
-        if re.search(r"\.alert\s*\([^)]*isPresented:", context):
-            continue
-        
-        # Skip if inside sheet/popover (also system-managed)
-        if re.search(r"\.(sheet|popover|fullScreenCover)\s*\([^)]*isPresented:", context):
+
+    # One sweep over the whole file for every element type; the per-line
+    # checks below only run on lines that actually declare an element.
+    hits = set()
+    for match in _INTERACTIVE_RE.finditer(data):
+        if b"\n" in match.group():
+            continue  # Element name and "(" must share a line
+        hits.add((bisect_right(line_starts, match.start()), _ELEMENT_ORDER[match.lastgroup]))
+    if not hits:
+        return issues
+
+    # Skip anything inside alert closures and sheets/popovers (system-managed)
+    presented = find_presented_lines(data, line_starts)
+
+    for line_idx, order in sorted(hits):
+        if presented[line_idx - 1]:
             continue
-        
-        # Check each interactive pattern
-        for pattern, element_type in INTERACTIVE_PATTERNS:
-            if re.search(pattern, line):
-                # Skip if this is a custom component (component should add identifier internally)
-                # Look for custom component names (capitalized, not Button/Toggle/Picker)
-                if re.search(r"\b[A-Z][a-zA-Z0-9]*Button\s*\(", line):
-                    continue  # Custom button component
-                if re.search(r"\b[A-Z][a-zA-Z0-9]*Toggle\s*\(", line):
-                    continue  # Custom toggle component
-                if re.search(r"\b[A-Z][a-zA-Z0-9]*Picker\s*\(", line):
-                    continue  # Custom picker component
-                
-                # Found an interactive element - check if it has accessibilityIdentifier
-                # Look ahead up to 80 lines for the modifier — some views have long
-                # modifier chains (tags, hover effects, etc.) before the identifier.
-                end_idx = min(line_idx + 80, len(lines))
-                
-                if not has_accessibility_identifier(lines, line_idx - 1, end_idx):
-                    # Check if this is inside a comment or string literal
-                    stripped = line.strip()
-                    if stripped.startswith("//") or stripped.startswith("/*"):
-                        continue
-
-                    # Skip function definitions that happen to contain
-                    # element names (e.g. handleToggle, addAppViaPicker)
-                    if re.search(r"\b(func|case\s+let)\b", stripped):
-                        continue
-                    
-                    # Skip if it's a toolbar item (system component)
-                    if re.search(r"ToolbarItem", content[max(0, line_idx - 5):line_idx]):
-                        continue
-                    
-                    # Skip guard statements (not actual UI elements)
-                    if re.search(r"guard\s+case\s+let\s+\.(tapHoldPicker|singleKeyPicker)", line):
-                        continue
-                    
-                    # Skip NSAlert buttons (system-managed, use different APIs)
-                    # Check if this Button is inside NSAlert context
-                    context_before = "\n".join(lines[max(0, line_idx - 15):line_idx])
-                    if re.search(r"alert\.addButton|NSAlert\(\)|let alert = NSAlert", context_before):
-                        continue
-                    
-                    issues.append((line_idx, element_type, line.strip()))
-    
+
+        # Only lines that declare an element are decoded
+        line = data[line_starts[line_idx - 1]:line_end(data, line_starts, line_idx - 1)].decode("utf-8")
+        element_type = INTERACTIVE_PATTERNS[order][1]
+
+        # Skip if this is a custom component (component should add identifier internally)
+        # Look for custom component names (capitalized, not Button/Toggle/Picker)
+        if _CUSTOM_BUTTON_RE.search(line):
+            continue  # Custom button component
+        if _CUSTOM_TOGGLE_RE.search(line):
+            continue  # Custom toggle component
+        if _CUSTOM_PICKER_RE.search(line):
+            continue  # Custom picker component
+
+        # Found an interactive element - check if it has accessibilityIdentifier
+        # Look ahead up to 80 lines for the modifier — some views have long
+        # modifier chains (tags, hover effects, etc.) before the identifier.
+        end_idx = min(line_idx + 80, len(line_starts))
+
+        if not has_accessibility_identifier(data, line_starts, line_idx - 1, end_idx):
+            # Check if this is inside a comment or string literal
+            stripped = line.strip()
+            if stripped.startswith("//") or stripped.startswith("/*"):
+                continue
+
+            # Skip function definitions that happen to contain
+            # element names (e.g. handleToggle, addAppViaPicker)
+            if _FUNC_DECL_RE.search(stripped):
+                continue
+
+            # Skip if it's a toolbar item (system component)
+            if data.find(b"ToolbarItem", max(0, line_idx - 5), line_idx) != -1:
+                continue
+
+            # Skip guard statements (not actual UI elements)
+            if _GUARD_RE.search(line):
+                continue
+
+            # Skip NSAlert buttons (system-managed, use different APIs)
+            # Check if this Button is inside NSAlert context
+            context_start = line_starts[max(0, line_idx - 15)]
+            context_end = line_end(data, line_starts, line_idx - 1)
+            if any(data.find(marker, context_start, context_end) != -1 for marker in NSALERT_MARKERS):
+                continue
+
+            issues.append((line_idx, element_type, line.strip()))
+
     return issues
 
 
+def scan_file(file_path: Path) -> Tuple[Path, List[Tuple[int, str, str]]]:
+    """Worker entry point: scan one file and return it with its issues."""
+    return file_path, find_interactive_elements(file_path)
+
+
+def file_digest(file_path: Path) -> Optional[str]:
+    """Content hash used as the cache key (None if the file can't be read)."""
+    try:
+        return hashlib.blake2b(file_path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def load_cache(cache_path: Path, checker_digest: str) -> Dict[str, List[Tuple[int, str, str]]]:
+    """Load cached issues per file digest, if written by this version of the checker."""
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if cache.get("checker") != checker_digest:
+        return {}
+    return {
+        digest: [tuple(issue) for issue in issues]
+        for digest, issues in cache.get("files", {}).items()
+    }
+
+
+def save_cache(cache_path: Path, checker_digest: str, files: Dict[str, List[Tuple[int, str, str]]]):
+    """Write the issues cache; failures only cost the next run a full scan."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({"checker": checker_digest, "files": files}), encoding="utf-8")
+    except OSError as e:
+        print(f"Warning: Could not write cache {cache_path}: {e}", file=sys.stderr)
+
+
 def main():
     """Main execution."""
     project_root = Path(__file__).parent.parent
@@ -153,16 +273,32 @@ def main():
     print()
     
     total_issues = 0
-    files_checked = 0
     
     # Find all Swift files in UI directory
-    for swift_file in sorted(ui_dir.rglob("*.swift")):
-        if is_excluded(swift_file):
-            continue
-        
-        files_checked += 1
-        issues = find_interactive_elements(swift_file)
-        
+    swift_files = sorted(Path(p) for p in iter_swift_files(str(ui_dir)))
+    swift_files = [f for f in swift_files if not is_excluded(f)]
+    files_checked = len(swift_files)
+
+    # Unchanged files reuse their cached issues; only new or edited ones are scanned
+    cache_path = project_root / CACHE_FILE
+    checker_digest = file_digest(Path(__file__))
+    cached = load_cache(cache_path, checker_digest)
+    digests = {f: file_digest(f) for f in swift_files}
+    misses = [f for f in swift_files if digests[f] is None or digests[f] not in cached]
+
+    # Files are independent, so scan them across processes; map() keeps
+    # results in input order so the report stays deterministic.
+    scanned = {}
+    if misses:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            scanned = dict(executor.map(scan_file, misses, chunksize=8))
+
+    results = {}
+    for swift_file in swift_files:
+        digest = digests[swift_file]
+        issues = scanned[swift_file] if swift_file in scanned else cached[digest]
+        if digest is not None:
+            results[digest] = issues
         if issues:
             rel_path = swift_file.relative_to(project_root)
             for line_num, element_type, line_content in issues:
@@ -174,6 +310,9 @@ def main():
                 print()
                 total_issues += 1
     
+    # Only entries for files that still exist are kept
+    save_cache(cache_path, checker_digest, results)
+
     print("━" * 80)
     print(f"Checked {files_checked} files")
     print()
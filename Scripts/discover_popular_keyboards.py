@@ -7,14 +7,21 @@ and creates a curated list of popular ones.
 """
 
 import json
-import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Set
 
+from qmk_cache import cached_get, has_cached, http_request
+
 BASE_URL = "https://raw.githubusercontent.com/qmk/qmk_firmware/master/keyboards"
 API_BASE = "https://api.github.com/repos/qmk/qmk_firmware/contents/keyboards"
 OUTPUT_FILE = "Sources/KeyPathAppKit/Resources/popular-keyboards.json"
 
+# Probes are network-bound, so run them concurrently; failures come back in
+# parallel too, which lets each individual probe give up sooner.
+MAX_WORKERS = 32
+PROBE_TIMEOUT = 3
+
 # Known popular keyboard names (we'll check if they exist)
 POPULAR_NAMES = {
     "crkbd", "sofle", "helix", "planck", "preonic", "ergodox_ez",
@@ -28,49 +35,51 @@ POPULAR_NAMES = {
 }
 
 
-def has_info_json(keyboard_path: str) -> tuple[str | None, Dict[str, Any] | None]:
-    """Check if keyboard has info.json and return path + data."""
-    # Try root level
+def fetch_info_json(keyboard_path: str) -> Dict[str, Any] | None:
+    """Fetch a keyboard's info.json, or None if it doesn't exist.
+
+    Most probed paths 404, so a HEAD request checks existence first and the
+    body is only downloaded for paths that actually have an info.json.
+    """
     url = f"{BASE_URL}/{keyboard_path}/info.json"
     try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            if response.status == 200:
-                data = json.loads(response.read())
-                return keyboard_path, data
+        if not has_cached(url):
+            status, _, _ = http_request(url, timeout=PROBE_TIMEOUT, method="HEAD")
+            if status != 200:
+                return None
+        return json.loads(cached_get(url, timeout=PROBE_TIMEOUT))
     except:
         pass
+    return None
+
+
+def has_info_json(keyboard_path: str) -> tuple[str | None, Dict[str, Any] | None]:
+    """Check if keyboard has info.json and return path + data."""
+    # Try root level
+    data = fetch_info_json(keyboard_path)
+    if data is not None:
+        return keyboard_path, data
     
     # Try common subdirectories
     for variant in ["rev1", "rev2", "rev3", "v1", "v2", "default", "standard", "lite_rev3", "glow_enc"]:
         variant_path = f"{keyboard_path}/{variant}"
-        url = f"{BASE_URL}/{variant_path}/info.json"
-        try:
-            with urllib.request.urlopen(url, timeout=5) as response:
-                if response.status == 200:
-                    data = json.loads(response.read())
-                    return variant_path, data
-        except:
-            continue
+        data = fetch_info_json(variant_path)
+        if data is not None:
+            return variant_path, data
     
     # List subdirectories and check each
     try:
         api_url = f"{API_BASE}/{keyboard_path}"
-        with urllib.request.urlopen(api_url, timeout=5) as response:
-            contents = json.loads(response.read())
-            dirs = [item["name"] for item in contents if item["type"] == "dir" and item["name"] not in ["keymaps", "lib"]]
-            
-            for subdir in dirs[:5]:  # Check first 5 subdirectories
-                variant_path = f"{keyboard_path}/{subdir}"
-                url = f"{BASE_URL}/{variant_path}/info.json"
-                try:
-                    with urllib.request.urlopen(url, timeout=5) as response:
-                        if response.status == 200:
-                            data = json.loads(response.read())
-                            return variant_path, data
-                except:
-                    continue
+        contents = json.loads(cached_get(api_url, timeout=PROBE_TIMEOUT))
+        dirs = [item["name"] for item in contents if item["type"] == "dir" and item["name"] not in ["keymaps", "lib"]]
     except:
-        pass
+        return None, None
+    
+    for subdir in dirs[:5]:  # Check first 5 subdirectories
+        variant_path = f"{keyboard_path}/{subdir}"
+        data = fetch_info_json(variant_path)
+        if data is not None:
+            return variant_path, data
     
     return None, None
 
@@ -81,10 +90,9 @@ def discover_keyboards() -> List[Dict[str, Any]]:
     
     # Get list of all keyboard directories
     try:
-        with urllib.request.urlopen(f"{API_BASE}?per_page=100", timeout=10) as response:
-            contents = json.loads(response.read())
-            keyboard_dirs = [item["name"] for item in contents if item["type"] == "dir"]
-            print(f"📦 Found {len(keyboard_dirs)} keyboard directories")
+        contents = json.loads(cached_get(f"{API_BASE}?per_page=100", timeout=10))
+        keyboard_dirs = [item["name"] for item in contents if item["type"] == "dir"]
+        print(f"📦 Found {len(keyboard_dirs)} keyboard directories")
     except Exception as e:
         print(f"❌ Failed to fetch keyboard list: {e}")
         return []
@@ -98,20 +106,24 @@ def discover_keyboards() -> List[Dict[str, Any]]:
     all_dirs = popular_dirs + other_dirs[:50]  # Check popular + 50 others
     
     print(f"🔍 Checking {len(all_dirs)} keyboards for info.json...")
-    for i, keyboard_dir in enumerate(all_dirs, 1):
-        if len(keyboards) >= 100:  # Limit to 100 keyboards
-            break
-        
-        if i % 10 == 0:
-            print(f"📊 Progress: {i}/{len(all_dirs)}, found {len(keyboards)} keyboards")
-        
-        path, info = has_info_json(keyboard_dir)
-        if path and info:
-            keyboards.append({
-                "path": path,
-                "display_name": info.get("keyboard_name") or info.get("name") or keyboard_dir,
-                "info": info
-            })
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # map() yields in submission order, so the bundle order is stable
+        results = executor.map(has_info_json, all_dirs)
+        for i, (keyboard_dir, (path, info)) in enumerate(zip(all_dirs, results), 1):
+            if len(keyboards) >= 100:  # Limit to 100 keyboards
+                # Don't download and parse info.json for boards we won't keep
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+            
+            if i % 10 == 0:
+                print(f"📊 Progress: {i}/{len(all_dirs)}, found {len(keyboards)} keyboards")
+            
+            if path and info:
+                keyboards.append({
+                    "path": path,
+                    "display_name": info.get("keyboard_name") or info.get("name") or keyboard_dir,
+                    "info": info
+                })
     
     return keyboards
 
@@ -125,7 +137,8 @@ def main():
         "keyboards": keyboards
     }
     
-    with open(OUTPUT_FILE, "w") as f:
+    # The bundle is checked in, so keep it indented for reviewable diffs
+    with open(OUTPUT_FILE, "w", buffering=1 << 20) as f:
         json.dump(output, f, indent=2)
     
     print(f"\n✅ Generated {OUTPUT_FILE}")
@@ -7,15 +7,22 @@ subdirectories for more keyboards.
 """
 
 import json
-import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 
+from qmk_cache import cached_get, has_cached, http_request
+
 BASE_URL = "https://raw.githubusercontent.com/qmk/qmk_firmware/master/keyboards"
 API_BASE = "https://api.github.com/repos/qmk/qmk_firmware/contents/keyboards"
 INPUT_FILE = "Sources/KeyPathAppKit/Resources/popular-keyboards.json"
 OUTPUT_FILE = "Sources/KeyPathAppKit/Resources/popular-keyboards.json"
 
+# Probes are network-bound, so run them concurrently; failures come back in
+# parallel too, which lets each individual probe give up sooner.
+MAX_WORKERS = 32
+PROBE_TIMEOUT = 3
+
 # Vendors to check (popular keyboard manufacturers)
 VENDORS_TO_CHECK = [
     "zsa",  # ZSA (Moonlander, Ergodox)
@@ -67,40 +74,35 @@ ADDITIONAL_KEYBOARDS = [
 
 
 def check_keyboard(keyboard_path: str) -> tuple[str | None, Dict[str, Any] | None]:
-    """Check if keyboard has info.json."""
+    """Check if keyboard has info.json.
+
+    Most probed paths 404, so a HEAD request checks existence first and the
+    body is only downloaded for paths that actually have an info.json.
+    """
     url = f"{BASE_URL}/{keyboard_path}/info.json"
     try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            if response.status == 200:
-                data = json.loads(response.read())
-                return keyboard_path, data
+        if not has_cached(url):
+            status, _, _ = http_request(url, timeout=PROBE_TIMEOUT, method="HEAD")
+            if status != 200:
+                return None, None
+        data = json.loads(cached_get(url, timeout=PROBE_TIMEOUT))
+        return keyboard_path, data
     except:
         pass
     return None, None
 
 
-def check_vendor_keyboards(vendor: str) -> List[Dict[str, Any]]:
-    """Check all keyboards under a vendor directory."""
-    keyboards = []
+def list_vendor_keyboards(vendor: str) -> List[str]:
+    """List keyboard directories under a vendor directory."""
     try:
         api_url = f"{API_BASE}/{vendor}"
-        with urllib.request.urlopen(api_url, timeout=10) as response:
-            contents = json.loads(response.read())
-            keyboard_dirs = [item["name"] for item in contents if item["type"] == "dir"]
-            
-            for kb_dir in keyboard_dirs[:20]:  # Limit to 20 per vendor
-                path = f"{vendor}/{kb_dir}"
-                actual_path, info = check_keyboard(path)
-                if actual_path and info:
-                    keyboards.append({
-                        "path": actual_path,
-                        "display_name": info.get("keyboard_name") or info.get("name") or kb_dir,
-                        "info": info
-                    })
+        contents = json.loads(cached_get(api_url, timeout=10))
+        keyboard_dirs = [item["name"] for item in contents if item["type"] == "dir"]
     except Exception as e:
         print(f"⚠️  Failed to check vendor {vendor}: {e}")
+        return []
     
-    return keyboards
+    return keyboard_dirs[:20]  # Limit to 20 per vendor
 
 
 def main():
@@ -117,37 +119,33 @@ def main():
     
     all_keyboards = {kb["path"]: kb for kb in existing["keyboards"]}
     
-    # Check vendor directories
-    print(f"🔍 Checking {len(VENDORS_TO_CHECK)} vendor directories...")
-    for vendor in VENDORS_TO_CHECK:
-        print(f"  Checking {vendor}...")
-        vendor_keyboards = check_vendor_keyboards(vendor)
-        for kb in vendor_keyboards:
-            if kb["path"] not in existing_paths:
-                all_keyboards[kb["path"]] = kb
-                print(f"    ✅ Added {kb['path']}")
+    # Collect every candidate path up front (path -> fallback display name)
+    # so paths reachable from several lists are only probed once
+    candidates: Dict[str, str] = {}
     
-    # Check additional keyboards with variants
-    print(f"\n🔍 Checking {len(ADDITIONAL_KEYBOARDS)} additional keyboards...")
-    for base_name, variants in ADDITIONAL_KEYBOARDS:
-        # Try base name first
-        path, info = check_keyboard(base_name)
-        if path and info and path not in existing_paths:
-            all_keyboards[path] = {
-                "path": path,
-                "display_name": info.get("keyboard_name") or info.get("name") or base_name,
-                "info": info
-            }
-            print(f"  ✅ Added {path}")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # Vendor directories
+        print(f"🔍 Listing {len(VENDORS_TO_CHECK)} vendor directories...")
+        for vendor, kb_dirs in zip(VENDORS_TO_CHECK, executor.map(list_vendor_keyboards, VENDORS_TO_CHECK)):
+            for kb_dir in kb_dirs:
+                candidates[f"{vendor}/{kb_dir}"] = kb_dir
+        
+        # Additional keyboards with variants (base name first, then variants)
+        for base_name, variants in ADDITIONAL_KEYBOARDS:
+            candidates[base_name] = base_name
+            for variant in variants:
+                variant_path = f"{base_name}/{variant}"
+                candidates[variant_path] = variant_path
+        
+        for path in existing_paths:
+            candidates.pop(path, None)
         
-        # Try variants
-        for variant in variants:
-            variant_path = f"{base_name}/{variant}"
-            path, info = check_keyboard(variant_path)
-            if path and info and path not in existing_paths:
+        print(f"\n🔍 Checking {len(candidates)} candidate keyboards...")
+        for candidate, (path, info) in zip(candidates, executor.map(check_keyboard, candidates)):
+            if path and info:
                 all_keyboards[path] = {
                     "path": path,
-                    "display_name": info.get("keyboard_name") or info.get("name") or variant_path,
+                    "display_name": info.get("keyboard_name") or info.get("name") or candidates[candidate],
                     "info": info
                 }
                 print(f"  ✅ Added {path}")
@@ -158,7 +156,8 @@ def main():
         "keyboards": list(all_keyboards.values())
     }
     
-    with open(OUTPUT_FILE, "w") as f:
+    # The bundle is checked in, so keep it indented for reviewable diffs
+    with open(OUTPUT_FILE, "w", buffering=1 << 20) as f:
         json.dump(output, f, indent=2)
     
     print(f"\n✅ Updated {OUTPUT_FILE}")
@@ -10,7 +10,10 @@ The image contains keyboards in a grid layout. This script:
 """
 
 from PIL import Image, ImageEnhance
+from concurrent.futures import ProcessPoolExecutor
 import os
+import shutil
+import subprocess
 
 IMAGE_PATH = "/Users/malpern/.cursor/projects/Users-malpern-local-code-KeyPath/assets/Gemini_Generated_Image_gndsoagndsoagnds-5ec340c1-b2af-456e-b811-df6d7fbf46d4.png"
 OUTPUT_DIR = "/Users/malpern/local-code/KeyPath/Sources/KeyPathAppKit/Resources/KeyboardIllustrations"
@@ -53,37 +56,69 @@ KEYBOARD_ORDER = [
     "HHKB layout keyboard",         # Likely the 12th keyboard
 ]
 
+# Optional PNG optimizers. oxipng (Rust, multithreaded) beats PIL's
+# optimize=True on both size and speed, so when it is available PIL only
+# does a fast compress_level=1 encode and oxipng does the real compression.
+try:
+    import oxipng  # pip install pyoxipng
+except ImportError:
+    oxipng = None
+OXIPNG_CLI = shutil.which("oxipng")
+OXIPNG_LEVEL = 2
+
 # Standard output size (will use largest keyboard as reference, or this if specified)
 STANDARD_WIDTH = 400
 STANDARD_HEIGHT = 300
 
-def find_content_bounds(img_region):
+# Threshold for content detection
+# Lower values = more sensitive (includes lighter grays)
+CONTENT_THRESHOLD = 250  # Very high threshold to detect any non-white content
+
+# Optional: with Numba installed, thresholding and the bounds scan are fused
+# into one compiled pass over each cell (_accel.bbox_scan). Without it we
+# fall back to a Pillow mask + getbbox().
+try:
+    import numpy as np
+    from _accel import HAVE_NUMBA, bbox_scan
+except ImportError:
+    HAVE_NUMBA = False
+
+def content_mask(img):
+    """
+    Prepare the whole image once for content detection.
+    Returns a grayscale array for the Numba kernel, otherwise a Pillow mask
+    with content pixels at 255 and background at 0.
+    """
+    gray = img.convert('L')
+    if HAVE_NUMBA:
+        return np.asarray(gray)
+    return gray.point(lambda p: 255 if p < CONTENT_THRESHOLD else 0)
+
+def find_content_bounds(mask, box):
     """
-    Find tight bounding box around keyboard content.
+    Find tight bounding box around keyboard content within box.
     Removes white space, boxes, and backgrounds.
+    Expects the image prepared by content_mask(); returns bounds relative
+    to the box.
     """
-    # Convert to grayscale for analysis
-    gray = img_region.convert('L')
-    pixels = gray.load()
-    width, height = gray.size
-    
-    # Threshold for content detection
-    # Lower values = more sensitive (includes lighter grays)
-    threshold = 250  # Very high threshold to detect any non-white content
-    
-    # Find bounding box of content
-    min_x, min_y = width, height
-    max_x, max_y = 0, 0
-    
-    found_content = False
-    for y in range(height):
-        for x in range(width):
-            if pixels[x, y] < threshold:
-                found_content = True
-                min_x = min(min_x, x)
-                min_y = min(min_y, y)
-                max_x = max(max_x, x)
-                max_y = max(max_y, y)
+    x1, y1, x2, y2 = box
+    width, height = x2 - x1, y2 - y1
+    
+    if HAVE_NUMBA:
+        # Slicing is a view, so the kernel reads the cell in place
+        min_x, min_y, max_x, max_y = (
+            int(v) for v in bbox_scan(mask[y1:y2, x1:x2, None], CONTENT_THRESHOLD)
+        )
+        found_content = min_y >= 0
+    else:
+        # Pillow's native getbbox() finds the non-zero extent of the mask
+        bbox = mask.crop(box).getbbox()
+        found_content = bbox is not None
+        if found_content:
+            # getbbox() is exclusive on the right/bottom edges
+            min_x, min_y, max_x, max_y = bbox
+            max_x -= 1
+            max_y -= 1
     
     if not found_content:
         # No content detected, return full region
@@ -98,9 +133,11 @@ def find_content_bounds(img_region):
     
     return (min_x, min_y, max_x, max_y)
 
-def extract_keyboard(img, row, col, total_rows, total_cols):
+def extract_keyboard(img, mask, row, col, total_rows, total_cols):
     """
     Extract a keyboard from the grid using row/col position.
+    Bounds come from the precomputed content mask, so the source image is
+    only cropped once, straight to the tight box.
     """
     width, height = img.size
     
@@ -114,15 +151,11 @@ def extract_keyboard(img, row, col, total_rows, total_cols):
     x2 = int((col + 1) * col_width)
     y2 = int((row + 1) * row_height)
     
-    # Crop region
-    region = img.crop((x1, y1, x2, y2))
-    
-    # Find tight content bounds
-    tight_bounds = find_content_bounds(region)
-    left, top, right, bottom = tight_bounds
+    # Find tight content bounds within the cell
+    left, top, right, bottom = find_content_bounds(mask, (x1, y1, x2, y2))
     
     # Crop to tight bounds
-    keyboard = region.crop((left, top, right, bottom))
+    keyboard = img.crop((x1 + left, y1 + top, x1 + right, y1 + bottom))
     
     return keyboard
 
@@ -139,7 +172,9 @@ def resize_to_standard(keyboard_img, target_width, target_height):
     # Resize maintaining aspect ratio
     new_width = int(keyboard_img.width * scale)
     new_height = int(keyboard_img.height * scale)
-    resized = keyboard_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    # reducing_gap lets Pillow box-reduce large downscales to within 2x of the
+    # target before the LANCZOS pass (no effect when upscaling)
+    resized = keyboard_img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=2.0)
     
     # Create new image with transparency
     if keyboard_img.mode == 'RGBA':
@@ -155,6 +190,23 @@ def resize_to_standard(keyboard_img, target_width, target_height):
     
     return result
 
+def save_png(item):
+    """
+    Save one standardized icon to OUTPUT_DIR.
+    Takes a (layout_id, image) tuple so it can be mapped over a process pool.
+    """
+    layout_id, standardized = item
+    output_path = os.path.join(OUTPUT_DIR, f"{layout_id}.png")
+    if oxipng is not None:
+        standardized.save(output_path, "PNG", compress_level=1)
+        oxipng.optimize(output_path, level=OXIPNG_LEVEL)
+    elif OXIPNG_CLI:
+        # Optimized in one batch by main() once every icon is written
+        standardized.save(output_path, "PNG", compress_level=1)
+    else:
+        standardized.save(output_path, "PNG", optimize=True)
+    return layout_id, standardized.size
+
 def main():
     if not os.path.exists(IMAGE_PATH):
         print(f"❌ Image not found: {IMAGE_PATH}")
@@ -173,6 +225,9 @@ def main():
     
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
+    # Prepare content detection once for all cells
+    mask = content_mask(img)
+    
     print("🎨 Extracting keyboard icons...\n")
     
     # Track dimensions to determine standard size
@@ -183,7 +238,7 @@ def main():
         row = idx // total_cols
         col = idx % total_cols
         
-        keyboard = extract_keyboard(img, row, col, total_rows, total_cols)
+        keyboard = extract_keyboard(img, mask, row, col, total_rows, total_cols)
         extracted_keyboards.append((display_name, keyboard))
         print(f"✓ Extracted {display_name}: {keyboard.size[0]}x{keyboard.size[1]} pixels")
     
@@ -198,7 +253,8 @@ def main():
     
     print(f"\n📏 Standard size: {standard_width}x{standard_height} pixels\n")
     
-    # Resize and save each keyboard
+    # Resize each keyboard
+    to_save = []
     for display_name, keyboard in extracted_keyboards:
         layout_id = KEYBOARD_NAMES.get(display_name)
         if not layout_id:
@@ -207,11 +263,17 @@ def main():
         
         # Resize to standard dimensions
         standardized = resize_to_standard(keyboard, standard_width, standard_height)
-        
-        # Save
-        output_path = os.path.join(OUTPUT_DIR, f"{layout_id}.png")
-        standardized.save(output_path, "PNG", optimize=True)
-        print(f"✓ Saved {layout_id:20s} -> {standardized.size[0]}x{standardized.size[1]} pixels")
+        to_save.append((layout_id, standardized))
+    
+    # Save: PNG optimization is CPU-bound zlib work, so encode across processes
+    with ProcessPoolExecutor() as executor:
+        for layout_id, size in executor.map(save_png, to_save):
+            print(f"✓ Saved {layout_id:20s} -> {size[0]}x{size[1]} pixels")
+    
+    if oxipng is None and OXIPNG_CLI:
+        output_paths = [os.path.join(OUTPUT_DIR, f"{layout_id}.png") for layout_id, _ in to_save]
+        subprocess.run([OXIPNG_CLI, "-o", str(OXIPNG_LEVEL), "--quiet", *output_paths], check=True)
+        print(f"✓ Optimized {len(output_paths)} PNGs with oxipng")
     
     print(f"\n✅ Processed {len(extracted_keyboards)} keyboards")
     print(f"   Output directory: {OUTPUT_DIR}")
@@ -6,124 +6,93 @@ All images are sized to a uniform canvas for consistent display in the UI.
 """
 
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import numpy as np
-from collections import deque
 import os
 
+try:
+    from scipy import ndimage
+except ImportError:
+    # Without SciPy, fall back to the compiled fill (a list-based BFS if
+    # Numba isn't installed either)
+    ndimage = None
+    from _accel import flood_fill_bg
+
 # Target canvas size for all keyboard images (width x height)
 # This aspect ratio works well for the drawer preview boxes
 TARGET_WIDTH = 400
 TARGET_HEIGHT = 140
 
+# Fast zlib level for iterating; run with --optimize for the shipped assets
+PNG_COMPRESS_LEVEL = 1
+
 
 def get_background_color(img):
     """Sample the background color from the corners of the image."""
-    pixels = img.load()
-    width, height = img.size
+    arr = np.asarray(img.convert('RGB'))
     
-    # Sample corners
-    corners = [
-        pixels[5, 5],
-        pixels[width - 6, 5],
-        pixels[5, height - 6],
-        pixels[width - 6, height - 6]
-    ]
-    
-    # Average the corner colors (assuming they're all background)
-    r = sum(c[0] for c in corners) // 4
-    g = sum(c[1] for c in corners) // 4
-    b = sum(c[2] for c in corners) // 4
+    # Sample 5x5 patches in each corner
+    patches = np.stack([arr[:5, :5], arr[:5, -5:], arr[-5:, :5], arr[-5:, -5:]]).reshape(-1, 3)
     
-    return (r, g, b)
-
-
-def color_distance(c1, c2):
-    """Calculate Euclidean distance between two RGB colors."""
-    return ((c1[0] - c2[0]) ** 2 + (c1[1] - c2[1]) ** 2 + (c1[2] - c2[2]) ** 2) ** 0.5
+    # Median is robust to a stray non-background pixel in a corner
+    return tuple(int(c) for c in np.median(patches, axis=0))
 
 
 def flood_fill_background(img, bg_color, tolerance=25):
     """
     Flood fill from edges to mark background pixels as transparent.
     Uses 8-connected neighbors for more thorough filling.
+
+    Vectorized: every pixel's squared distance to the background colour is
+    thresholded at once, then 8-connected background regions are labelled
+    and the ones touching an edge of the image become transparent.
     """
-    width, height = img.size
-    pixels = img.load()
-    
-    # Create alpha mask (255 = opaque, 0 = transparent)
-    alpha = [[255 for _ in range(width)] for _ in range(height)]
-    visited = [[False for _ in range(width)] for _ in range(height)]
+    rgb = np.asarray(img.convert('RGB'))
+    if ndimage is None:
+        alpha = np.full(rgb.shape[:2], 255, dtype=np.uint8)
+        flood_fill_bg(rgb, bg_color[0], bg_color[1], bg_color[2], tolerance * tolerance, alpha)
+        return alpha
     
-    # Start flood fill from all edge pixels
-    queue = deque()
+    diff = rgb.astype(np.int32) - np.array(bg_color, dtype=np.int32)
+    dist2 = np.einsum('...c,...c->...', diff, diff)
+    bg_mask = dist2 <= tolerance * tolerance
     
-    # Add all edge pixels to queue
-    for x in range(width):
-        queue.append((x, 0))
-        queue.append((x, height - 1))
-    for y in range(height):
-        queue.append((0, y))
-        queue.append((width - 1, y))
+    # Label 8-connected background regions and keep those reachable from an edge
+    labels, _ = ndimage.label(bg_mask, structure=np.ones((3, 3), dtype=np.uint8))
+    edge_labels = np.unique(np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]]))
+    edge_labels = edge_labels[edge_labels != 0]
     
-    # 8-connected neighbors
-    neighbors = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-    
-    while queue:
-        x, y = queue.popleft()
-        
-        if x < 0 or x >= width or y < 0 or y >= height:
-            continue
-        if visited[y][x]:
-            continue
-            
-        visited[y][x] = True
-        pixel = pixels[x, y]
-        
-        # Check if this pixel is close to background color
-        if color_distance(pixel[:3], bg_color) <= tolerance:
-            alpha[y][x] = 0  # Make transparent
-            
-            # Add neighbors to queue
-            for dx, dy in neighbors:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < width and 0 <= ny < height and not visited[ny][nx]:
-                    queue.append((nx, ny))
-    
-    return alpha
+    # Create alpha mask (255 = opaque, 0 = transparent)
+    return np.where(np.isin(labels, edge_labels), 0, 255).astype(np.uint8)
 
 
 def apply_alpha_mask(img, alpha):
     """Apply alpha mask to image, creating RGBA output."""
-    width, height = img.size
-    pixels = img.load()
-    
-    # Create new RGBA image
-    result = Image.new('RGBA', (width, height))
-    result_pixels = result.load()
-    
-    for y in range(height):
-        for x in range(width):
-            r, g, b = pixels[x, y][:3]
-            a = alpha[y][x]
-            result_pixels[x, y] = (r, g, b, a)
-    
+    result = img.convert('RGBA')
+    result.putalpha(Image.fromarray(alpha, 'L'))
     return result
 
 
-def crop_to_content(img, padding=2):
-    """Crop image to non-transparent content with optional padding."""
-    # Get bounding box of non-transparent pixels
-    bbox = img.getbbox()
-    if bbox is None:
-        return img
+def content_bounds(alpha, padding=2):
+    """Return the (left, top, right, bottom) box of non-transparent content with optional padding."""
+    height, width = alpha.shape
+    nz_rows = np.any(alpha, axis=1)
+    nz_cols = np.any(alpha, axis=0)
+    if not nz_rows.any():
+        return (0, 0, width, height)
+    top = nz_rows.argmax()
+    bottom = len(nz_rows) - nz_rows[::-1].argmax()
+    left = nz_cols.argmax()
+    right = len(nz_cols) - nz_cols[::-1].argmax()
     
     # Add padding
-    left = max(0, bbox[0] - padding)
-    top = max(0, bbox[1] - padding)
-    right = min(img.width, bbox[2] + padding)
-    bottom = min(img.height, bbox[3] + padding)
+    left = max(0, left - padding)
+    top = max(0, top - padding)
+    right = min(width, right + padding)
+    bottom = min(height, bottom + padding)
     
-    return img.crop((left, top, right, bottom))
+    return (int(left), int(top), int(right), int(bottom))
 
 
 def fit_to_canvas(img, target_width, target_height, padding=8):
@@ -140,21 +109,23 @@ def fit_to_canvas(img, target_width, target_height, padding=8):
     scale_h = available_height / img.height
     scale = min(scale_w, scale_h)
     
-    # Resize image
+    # Resize image (large sources are box-reduced first, LANCZOS only
+    # runs on the last <2x step)
     new_width = int(img.width * scale)
     new_height = int(img.height * scale)
-    resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=2.0)
     
     # Create transparent canvas
-    canvas = Image.new('RGBA', (target_width, target_height), (0, 0, 0, 0))
+    canvas = np.zeros((target_height, target_width, 4), dtype=np.uint8)
     
-    # Center the image on the canvas
+    # Center the image on the canvas (a straight copy: the canvas is empty,
+    # so there is nothing to composite against)
     x = (target_width - new_width) // 2
     y = (target_height - new_height) // 2
     
-    canvas.paste(resized, (x, y), resized)
+    canvas[y:y + new_height, x:x + new_width] = np.asarray(resized.convert('RGBA'))
     
-    return canvas
+    return Image.fromarray(canvas, 'RGBA')
 
 
 def extract_keyboard_with_transparency(img, bg_color, tolerance=25):
@@ -162,15 +133,34 @@ def extract_keyboard_with_transparency(img, bg_color, tolerance=25):
     # Flood fill to find background
     alpha = flood_fill_background(img, bg_color, tolerance)
     
-    # Apply alpha mask
-    result = apply_alpha_mask(img, alpha)
-    
-    # Crop to content
-    result = crop_to_content(result)
+    # Crop the source and the mask to the content first, so the RGBA image is
+    # only ever built at cropped size
+    left, top, right, bottom = content_bounds(alpha)
+    result = apply_alpha_mask(img.crop((left, top, right, bottom)), alpha[top:bottom, left:right])
     
     return result
 
 
+def process_cell(job):
+    """
+    Extract, fit and save one contact-sheet cell.
+    Takes a (name, cell, bg_color, tolerance, output_dir) tuple so it can be
+    mapped over a process pool.
+    """
+    name, cell, bg_color, tolerance, output_dir = job
+    
+    # Extract with transparency
+    result = extract_keyboard_with_transparency(cell, bg_color, tolerance)
+    
+    # Fit to uniform canvas
+    result = fit_to_canvas(result, TARGET_WIDTH, TARGET_HEIGHT)
+    
+    # Save
+    output_path = os.path.join(output_dir, f"{name}.png")
+    result.save(output_path, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return name, output_path, result.size
+
+
 def process_contact_sheet(input_path, output_dir, rows=5, cols=3, tolerance=25):
     """
     Process a contact sheet and extract individual keyboards with transparency.
@@ -222,40 +212,34 @@ def process_contact_sheet(input_path, output_dir, rows=5, cols=3, tolerance=25):
     # Skip duplicates
     skip_names = {"ansi-65-alt", "ansi-75-alt", "corne-alt"}
     
+    # Flatten the config into row-major (row, col, name, margins) entries,
+    # dropping skipped duplicates and cells outside the grid
+    entries = [
+        (row, col, name, margins)
+        for (row, col), (name, margins) in sorted(keyboard_config.items())
+        if row < rows and col < cols and name not in skip_names
+    ]
+    
+    jobs = []
+    for row, col, name, (top_margin, right_margin, bottom_margin, left_margin) in entries:
+        # Calculate cell boundaries with margins
+        x1 = col * cell_width + left_margin
+        y1 = row * cell_height + top_margin
+        x2 = (col + 1) * cell_width - right_margin
+        y2 = (row + 1) * cell_height - bottom_margin
+        
+        print(f"Extracting {name} from ({x1},{y1}) to ({x2},{y2})...")
+        
+        # Crop cell with margins
+        cell = img.crop((x1, y1, x2, y2))
+        jobs.append((name, cell, bg_color, tolerance, output_dir))
+    
+    # The cropped cells are independent, so the flood fill, resize and save
+    # run in parallel across processes; map() keeps the log in grid order
     extracted = []
-    for row in range(rows):
-        for col in range(cols):
-            config = keyboard_config.get((row, col))
-            if config is None:
-                continue
-            
-            name, margins = config
-            if name in skip_names:
-                continue
-            
-            top_margin, right_margin, bottom_margin, left_margin = margins
-            
-            # Calculate cell boundaries with margins
-            x1 = col * cell_width + left_margin
-            y1 = row * cell_height + top_margin
-            x2 = (col + 1) * cell_width - right_margin
-            y2 = (row + 1) * cell_height - bottom_margin
-            
-            print(f"Extracting {name} from ({x1},{y1}) to ({x2},{y2})...")
-            
-            # Crop cell with margins
-            cell = img.crop((x1, y1, x2, y2))
-            
-            # Extract with transparency
-            result = extract_keyboard_with_transparency(cell, bg_color, tolerance)
-            
-            # Fit to uniform canvas
-            result = fit_to_canvas(result, TARGET_WIDTH, TARGET_HEIGHT)
-            
-            # Save
-            output_path = os.path.join(output_dir, f"{name}.png")
-            result.save(output_path, 'PNG')
-            print(f"  Saved: {output_path} ({result.width}x{result.height})")
+    with ProcessPoolExecutor(max_workers=max(1, min(len(jobs), os.cpu_count() or 1))) as executor:
+        for name, output_path, (w, h) in executor.map(process_cell, jobs):
+            print(f"  Saved: {output_path} ({w}x{h})")
             extracted.append(name)
     
     return extracted
@@ -282,17 +266,33 @@ def process_single_keyboard(input_path, output_path, tolerance=25):
     result = fit_to_canvas(result, TARGET_WIDTH, TARGET_HEIGHT)
     
     # Save
-    result.save(output_path, 'PNG')
+    result.save(output_path, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
     print(f"Saved: {output_path} ({result.width}x{result.height})")
     
     return output_path
 
 
+def optimize_pngs(paths):
+    """Re-save PNGs with maximum compression (slow, so done once at the end)."""
+    for path in paths:
+        with Image.open(path) as img:
+            img.load()
+        img.save(path, 'PNG', optimize=True)
+        print(f"  Optimized: {path} ({os.path.getsize(path)} bytes)")
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Extract keyboard images with transparent backgrounds')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Re-save all outputs with maximum PNG compression at the end')
+    args = parser.parse_args()
+    
     base_dir = "/Users/malpern/local-code/KeyPath"
     assets_dir = os.path.join(base_dir, "assets/keyboards")
     output_dir = os.path.join(base_dir, "Sources/KeyPathAppKit/Resources/KeyboardIllustrations")
     
+    written = []
+    
     # Process contact sheet
     contact_sheet = os.path.join(assets_dir, "contact-sheet.png")
     if os.path.exists(contact_sheet):
@@ -301,6 +301,7 @@ def main():
         print("="*60)
         extracted = process_contact_sheet(contact_sheet, output_dir, rows=5, cols=3, tolerance=30)
         print(f"\nExtracted {len(extracted)} keyboards from contact sheet")
+        written += [os.path.join(output_dir, f"{name}.png") for name in extracted]
     
     # Process MacBook JIS separately
     macbook_jis = os.path.join(assets_dir, "macbook-jis-source.png")
@@ -309,7 +310,7 @@ def main():
         print("Processing MacBook JIS keyboard...")
         print("="*60)
         output_path = os.path.join(output_dir, "macbook-jis.png")
-        process_single_keyboard(macbook_jis, output_path, tolerance=30)
+        written.append(process_single_keyboard(macbook_jis, output_path, tolerance=30))
     
     # Resize macbook-us to match
     macbook_us_path = os.path.join(output_dir, "macbook-us.png")
@@ -322,11 +323,18 @@ def main():
             img = img.convert('RGBA')
         if img.width != TARGET_WIDTH or img.height != TARGET_HEIGHT:
             result = fit_to_canvas(img, TARGET_WIDTH, TARGET_HEIGHT)
-            result.save(macbook_us_path, 'PNG')
+            result.save(macbook_us_path, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
             print(f"Resized macbook-us.png to {TARGET_WIDTH}x{TARGET_HEIGHT}")
+            written.append(macbook_us_path)
         else:
             print("macbook-us.png already correct size")
     
+    if args.optimize and written:
+        print("\n" + "="*60)
+        print(f"Optimizing {len(written)} PNGs...")
+        print("="*60)
+        optimize_pngs(written)
+    
     print("\n" + "="*60)
     print("Extraction complete!")
     print(f"All images sized to {TARGET_WIDTH}x{TARGET_HEIGHT} for consistent display")
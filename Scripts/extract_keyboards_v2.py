@@ -5,104 +5,82 @@ Uses LOW tolerance to avoid eating into the keyboard images.
 """
 
 from PIL import Image
+import argparse
+import numpy as np
 import os
-import math
+
+try:
+    from scipy import ndimage
+except ImportError:
+    # Without SciPy, fall back to the compiled fill (a list-based BFS if
+    # Numba isn't installed either)
+    ndimage = None
+    from _accel import flood_fill_bg
 
 # Target output size for all images
 TARGET_WIDTH = 400
 TARGET_HEIGHT = 140
 
+# Fast zlib level while iterating; --optimize recompresses at the end
+PNG_COMPRESS_LEVEL = 1
+
 def get_background_color(img):
     """Sample corners to get background color."""
-    w, h = img.size
-    corners = [
-        img.getpixel((5, 5)),
-        img.getpixel((w - 5, 5)),
-        img.getpixel((5, h - 5)),
-        img.getpixel((w - 5, h - 5)),
-    ]
-    # Average the corners
-    r = sum(c[0] for c in corners) // 4
-    g = sum(c[1] for c in corners) // 4
-    b = sum(c[2] for c in corners) // 4
-    return (r, g, b)
-
-def color_distance(c1, c2):
-    """Euclidean distance between two RGB colors."""
-    return math.sqrt(sum((a - b) ** 2 for a, b in zip(c1, c2)))
+    arr = np.asarray(img.convert('RGB'))
+    patches = np.stack([arr[:5, :5], arr[:5, -5:], arr[-5:, :5], arr[-5:, -5:]]).reshape(-1, 3)
+    # Median of the corner patches (robust to a stray pixel)
+    return tuple(int(c) for c in np.median(patches, axis=0))
 
 def flood_fill_background(img, bg_color, tolerance=12):
     """
     Flood fill from edges to mark background pixels.
     Uses LOW tolerance (12) to be very conservative and not eat into keyboards.
+
+    Vectorized: every pixel's squared distance to the background colour is
+    thresholded at once, then 8-connected background regions are labelled
+    and the ones touching an edge of the image become transparent.
     """
-    w, h = img.size
-    pixels = img.load()
+    rgb = np.asarray(img.convert('RGB'))
+    if ndimage is None:
+        alpha = np.full(rgb.shape[:2], 255, dtype=np.uint8)
+        flood_fill_bg(rgb, bg_color[0], bg_color[1], bg_color[2], tolerance * tolerance, alpha)
+        return alpha
+    
+    diff = rgb.astype(np.int32) - np.array(bg_color, dtype=np.int32)
+    dist2 = np.einsum('...c,...c->...', diff, diff)
+    bg_mask = dist2 <= tolerance * tolerance
+    
+    # Label 8-connected background regions and keep those reachable from an edge
+    labels, _ = ndimage.label(bg_mask, structure=np.ones((3, 3), dtype=np.uint8))
+    edge_labels = np.unique(np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]]))
+    edge_labels = edge_labels[edge_labels != 0]
     
     # Create alpha mask (255 = opaque, 0 = transparent)
-    alpha = Image.new('L', (w, h), 255)
-    alpha_pixels = alpha.load()
-    
-    # Track visited pixels
-    visited = set()
-    
-    # Start from all edge pixels
-    queue = []
-    for x in range(w):
-        queue.append((x, 0))
-        queue.append((x, h - 1))
-    for y in range(h):
-        queue.append((0, y))
-        queue.append((w - 1, y))
-    
-    # 8-connected flood fill
-    directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-    
-    while queue:
-        x, y = queue.pop(0)
-        
-        if (x, y) in visited:
-            continue
-        if x < 0 or x >= w or y < 0 or y >= h:
-            continue
-            
-        visited.add((x, y))
-        
-        pixel = pixels[x, y]
-        if len(pixel) == 4:
-            pixel = pixel[:3]
-        
-        dist = color_distance(pixel, bg_color)
-        
-        if dist <= tolerance:
-            alpha_pixels[x, y] = 0  # Make transparent
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
-                if (nx, ny) not in visited:
-                    queue.append((nx, ny))
-    
-    return alpha
+    return np.where(np.isin(labels, edge_labels), 0, 255).astype(np.uint8)
 
 def apply_alpha_mask(img, alpha):
     """Convert RGB image to RGBA with alpha mask."""
     if img.mode != 'RGB':
         img = img.convert('RGB')
     rgba = img.copy()
-    rgba.putalpha(alpha)
+    rgba.putalpha(Image.fromarray(alpha, 'L'))
     return rgba
 
-def crop_to_content(img, padding=2):
-    """Crop image to bounding box of non-transparent content."""
-    bbox = img.getbbox()
-    if bbox:
-        left, top, right, bottom = bbox
+def content_bounds(alpha, padding=2):
+    """Bounding box (left, top, right, bottom) of non-transparent content."""
+    h, w = alpha.shape
+    nz_rows = np.any(alpha, axis=1)
+    nz_cols = np.any(alpha, axis=0)
+    if nz_rows.any():
+        top, bottom = nz_rows.argmax(), len(nz_rows) - nz_rows[::-1].argmax()
+        left, right = nz_cols.argmax(), len(nz_cols) - nz_cols[::-1].argmax()
         # Add padding
         left = max(0, left - padding)
         top = max(0, top - padding)
-        right = min(img.size[0], right + padding)
-        bottom = min(img.size[1], bottom + padding)
-        return img.crop((left, top, right, bottom))
-    return img
+        right = min(w, right + padding)
+        bottom = min(h, bottom + padding)
+        return (int(left), int(top), int(right), int(bottom))
+    return (0, 0, w, h)
 
 def fit_to_canvas(img, target_width, target_height, padding=6):
     """
@@ -121,18 +99,19 @@ def fit_to_canvas(img, target_width, target_height, padding=6):
     scale_h = avail_h / h
     scale = min(scale_w, scale_h)
     
-    # Scale the image
+    # Scale the image (two-step: cheap box reduce, then LANCZOS within 2x)
     new_w = int(w * scale)
     new_h = int(h * scale)
-    scaled = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+    scaled = img.resize((new_w, new_h), Image.Resampling.LANCZOS, reducing_gap=2.0)
     
     # Create transparent canvas
-    canvas = Image.new('RGBA', (target_width, target_height), (0, 0, 0, 0))
+    canvas_np = np.zeros((target_height, target_width, 4), dtype=np.uint8)
     
-    # Center the scaled image
+    # Center the scaled image (plain copy onto the empty canvas)
     x = (target_width - new_w) // 2
     y = (target_height - new_h) // 2
-    canvas.paste(scaled, (x, y), scaled)
+    canvas_np[y:y + new_h, x:x + new_w] = np.asarray(scaled.convert('RGBA'))
+    canvas = Image.fromarray(canvas_np, 'RGBA')
     
     # Report fill ratio
     fill_w = new_w / target_width * 100
@@ -171,10 +150,11 @@ def extract_keyboard(contact_sheet, row, col, rows, cols, margins, name, output_
     print(f"    Background color: {bg_color}")
     
     alpha = flood_fill_background(cell, bg_color, tolerance=tolerance)
-    rgba = apply_alpha_mask(cell, alpha)
     
-    # Crop to content
-    cropped = crop_to_content(rgba, padding=2)
+    # Crop cell and mask to content, then build RGBA at cropped size
+    c_left, c_top, c_right, c_bottom = content_bounds(alpha, padding=2)
+    cropped = apply_alpha_mask(cell.crop((c_left, c_top, c_right, c_bottom)),
+                               alpha[c_top:c_bottom, c_left:c_right])
     print(f"    Cropped size: {cropped.size}")
     
     # Fit to standard canvas
@@ -182,12 +162,17 @@ def extract_keyboard(contact_sheet, row, col, rows, cols, margins, name, output_
     
     # Save
     output_path = os.path.join(output_dir, f"{name}.png")
-    final.save(output_path)
+    final.save(output_path, compress_level=PNG_COMPRESS_LEVEL)
     print(f"    Saved: {output_path}")
     
     return final
 
 def main():
+    parser = argparse.ArgumentParser(description='Extract keyboard images from the contact sheet')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Re-save outputs with maximum PNG compression when done')
+    args = parser.parse_args()
+    
     input_path = "/Users/malpern/local-code/KeyPath/assets/keyboards/contact-sheet-new.png"
     output_dir = "/Users/malpern/local-code/KeyPath/Sources/KeyPathAppKit/Resources/KeyboardIllustrations"
     
@@ -221,6 +206,15 @@ def main():
     for (row, col), (name, margins) in keyboards.items():
         extract_keyboard(img, row, col, rows, cols, margins, name, output_dir, tolerance=12)
     
+    if args.optimize:
+        print("\nOptimizing PNGs...")
+        for name, _ in keyboards.values():
+            output_path = os.path.join(output_dir, f"{name}.png")
+            with Image.open(output_path) as saved:
+                saved.load()
+            saved.save(output_path, optimize=True)
+            print(f"  {name}: {os.path.getsize(output_path)} bytes")
+    
     print("\n✅ Done!")
 
 if __name__ == "__main__":
@@ -7,9 +7,11 @@ database that can be included in the app for instant search results.
 """
 
 import json
-import urllib.request
 import urllib.error
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Set
+
+from qmk_cache import cached_get, cached_lookup, http_request
 
 # Popular keyboards to include in bundle
 # Based on: community popularity, already in app, common form factors
@@ -92,37 +94,82 @@ POPULAR_KEYBOARDS = [
 ]
 
 BASE_URL = "https://raw.githubusercontent.com/qmk/qmk_firmware/master/keyboards"
+TREE_URL = "https://api.github.com/repos/qmk/qmk_firmware/git/trees/master?recursive=1"
 OUTPUT_FILE = "Sources/KeyPathAppKit/Resources/popular-keyboards.json"
 
+# Fetches are network-bound, so overlap them across threads
+MAX_WORKERS = 16
+
+
+def fetch_info_json_dirs() -> Set[str] | None:
+    """List every keyboard directory that has an info.json, in one request.
+
+    Uses the recursive git tree of qmk_firmware. Returns None if the listing
+    can't be fetched or GitHub truncated it.
+    """
+    try:
+        tree = json.loads(cached_get(TREE_URL, timeout=60))
+    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError) as e:
+        print(f"⚠️  Failed to fetch keyboard tree, probing instead: {e}")
+        return None
+    if tree.get("truncated"):
+        print("⚠️  Keyboard tree listing was truncated, probing instead")
+        return None
+    
+    prefix, suffix = "keyboards/", "/info.json"
+    return {
+        entry["path"][len(prefix):-len(suffix)]
+        for entry in tree["tree"]
+        if entry["type"] == "blob" and entry["path"].startswith(prefix) and entry["path"].endswith(suffix)
+    }
+
+
+def find_info_json_path(keyboard_path: str, info_dirs: Set[str] | None = None) -> str | None:
+    """Find the actual path to info.json.
+
+    With a prefetched `info_dirs` listing this is an in-memory lookup: the
+    keyboard's own directory if it has an info.json, else its first
+    subdirectory (alphabetically) that does. Without one, fall back to
+    probing over the network, reusing results cached on disk.
+    """
+    if info_dirs is None:
+        return cached_lookup(keyboard_path, probe_info_json_path)
+    
+    if keyboard_path in info_dirs:
+        return keyboard_path
+    prefix = keyboard_path + "/"
+    variants = sorted(d for d in info_dirs if d.startswith(prefix) and "/" not in d[len(prefix):])
+    return variants[0] if variants else None
+
 
-def find_info_json_path(keyboard_path: str) -> str | None:
-    """Find the actual path to info.json (may be in subdirectories)."""
+def probe_info_json_path(keyboard_path: str) -> str | None:
+    """Find the actual path to info.json (may be in subdirectories).
+
+    Probes are HEAD requests; only fetch_keyboard_info downloads the body.
+    """
     # Try root level first
     url = f"{BASE_URL}/{keyboard_path}/info.json"
     try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            if response.status == 200:
-                return keyboard_path
+        if http_request(url, timeout=5, method="HEAD")[0] == 200:
+            return keyboard_path
     except:
         pass
     
     # List subdirectories and check each
     try:
         api_url = f"https://api.github.com/repos/qmk/qmk_firmware/contents/keyboards/{keyboard_path}"
-        with urllib.request.urlopen(api_url, timeout=5) as response:
-            contents = json.loads(response.read())
-            dirs = [item["name"] for item in contents if item["type"] == "dir"]
-            
-            # Try each subdirectory
-            for subdir in dirs[:10]:  # Limit to first 10 to avoid too many requests
-                variant_path = f"{keyboard_path}/{subdir}"
-                url = f"{BASE_URL}/{variant_path}/info.json"
-                try:
-                    with urllib.request.urlopen(url, timeout=5) as response:
-                        if response.status == 200:
-                            return variant_path
-                except:
-                    continue
+        contents = json.loads(http_request(api_url, timeout=5)[2])
+        dirs = [item["name"] for item in contents if item["type"] == "dir"]
+        
+        # Try each subdirectory
+        for subdir in dirs[:10]:  # Limit to first 10 to avoid too many requests
+            variant_path = f"{keyboard_path}/{subdir}"
+            url = f"{BASE_URL}/{variant_path}/info.json"
+            try:
+                if http_request(url, timeout=5, method="HEAD")[0] == 200:
+                    return variant_path
+            except:
+                continue
     except:
         pass
     
@@ -131,32 +178,30 @@ def find_info_json_path(keyboard_path: str) -> str | None:
         variant_path = f"{keyboard_path}/{variant}"
         url = f"{BASE_URL}/{variant_path}/info.json"
         try:
-            with urllib.request.urlopen(url, timeout=5) as response:
-                if response.status == 200:
-                    return variant_path
+            if http_request(url, timeout=5, method="HEAD")[0] == 200:
+                return variant_path
         except:
             continue
     
     return None
 
 
-def fetch_keyboard_info(keyboard_path: str, display_name: str) -> Dict[str, Any] | None:
+def fetch_keyboard_info(keyboard_path: str, display_name: str, info_dirs: Set[str] | None = None) -> Dict[str, Any] | None:
     """Fetch info.json for a keyboard."""
     # Find actual path to info.json
-    actual_path = find_info_json_path(keyboard_path)
+    actual_path = find_info_json_path(keyboard_path, info_dirs)
     if not actual_path:
         print(f"⚠️  No info.json found for {keyboard_path}")
         return None
     
     url = f"{BASE_URL}/{actual_path}/info.json"
     try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            data = json.loads(response.read())
-            return {
-                "path": actual_path,
-                "display_name": display_name,
-                "info": data
-            }
+        data = json.loads(cached_get(url, timeout=5))
+        return {
+            "path": actual_path,
+            "display_name": display_name,
+            "info": data
+        }
     except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError) as e:
         print(f"⚠️  Failed to fetch {keyboard_path}: {e}")
         return None
@@ -164,21 +209,27 @@ def fetch_keyboard_info(keyboard_path: str, display_name: str) -> Dict[str, Any]
 
 def main():
     """Generate popular keyboards bundle."""
+    print("🌳 Listing keyboards with info.json...")
+    info_dirs = fetch_info_json_dirs()
+    
     print(f"🔍 Fetching {len(POPULAR_KEYBOARDS)} popular keyboards...")
     
     keyboards = []
-    for i, (keyboard_path, display_name) in enumerate(POPULAR_KEYBOARDS, 1):
-        print(f"[{i}/{len(POPULAR_KEYBOARDS)}] Fetching {keyboard_path} ({display_name})...")
-        result = fetch_keyboard_info(keyboard_path, display_name)
-        if result:
-            keyboards.append(result)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # map() yields in submission order, so the bundle order is stable
+        results = executor.map(lambda kv: fetch_keyboard_info(*kv, info_dirs), POPULAR_KEYBOARDS)
+        for i, ((keyboard_path, display_name), result) in enumerate(zip(POPULAR_KEYBOARDS, results), 1):
+            print(f"[{i}/{len(POPULAR_KEYBOARDS)}] Fetched {keyboard_path} ({display_name})")
+            if result:
+                keyboards.append(result)
     
     output = {
         "version": "1.0",
         "keyboards": keyboards
     }
     
-    with open(OUTPUT_FILE, "w") as f:
+    # The bundle is checked in, so keep it indented for reviewable diffs
+    with open(OUTPUT_FILE, "w", buffering=1 << 20) as f:
         json.dump(output, f, indent=2)
     
     print(f"\n✅ Generated {OUTPUT_FILE}")
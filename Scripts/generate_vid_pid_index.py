@@ -12,6 +12,7 @@ Rate-limited to ~5 requests/second to be respectful to the QMK API.
 Caches responses locally in /tmp/qmk-vid-pid-cache/ to support resuming.
 """
 
+import gzip
 import json
 import os
 import sys
@@ -49,13 +50,16 @@ def fetch_keyboard_info(path):
 
     url = f"{QMK_API_BASE}/{path}/info.json"
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "KeyPath/1.0"})
+        req = urllib.request.Request(url, headers={"User-Agent": "KeyPath/1.0", "Accept-Encoding": "gzip"})
         with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-            cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(cache_file, "w") as f:
-                json.dump(data, f)
-            return data
+            body = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+        data = json.loads(body)
+        # Cache the bytes as received rather than re-encoding the parsed JSON
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_bytes(body)
+        return data
     except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError) as e:
         print(f"  SKIP {path}: {e}", file=sys.stderr)
         return None
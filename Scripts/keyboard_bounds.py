@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Shared content-bounds detection for the keyboard image slicers.
+
+Keyboards sit on a near-white background, so the tight crop is the bounding
+box of every pixel darker than a threshold.
+"""
+
+import os
+import shelve
+
+import numpy as np
+
+from _accel import HAVE_NUMBA, bbox_scan
+
+# Stride of the coarse sampling pass in tight_bbox
+COARSE_STEP = 8
+
+# Tight boxes from earlier runs, keyed by image identity, region and params.
+# Kept in the per-user cache directory, so runs from any working directory
+# share one cache and nothing is written into the checkout
+BBOX_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "keypath", "bbox_cache",
+)
+
+# Above this many pixels, use the compiled bbox_scan when Numba is available
+# (no temporary masks, and it only visits pixels outside the content box)
+NUMBA_MIN_PIXELS = 4_000_000
+
+
+def luminance(arr):
+    """
+    Grayscale an (H, W, 3|4) uint8 array exactly as Pillow's convert('L') does
+    (ITU-R 601-2 luma, 16-bit fixed point, alpha ignored).
+    """
+    rgb = arr[..., :3].astype(np.uint32)
+    gray = rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000
+    return (gray >> 16).astype(np.uint8)
+
+
+def clamp_boxes(boxes, width, height):
+    """
+    Clamp a batch of (x1, y1, x2, y2) boxes to a width x height image.
+
+    Returns an (N, 4) int array where each box is clipped to the image and
+    x2/y2 are never less than x1/y1, so every row is safe to slice with.
+    """
+    clamped = np.array(boxes, dtype=np.int64).reshape(-1, 4)
+    np.clip(clamped[:, 0::2], 0, width, out=clamped[:, 0::2])
+    np.clip(clamped[:, 1::2], 0, height, out=clamped[:, 1::2])
+    np.maximum(clamped[:, 2:], clamped[:, :2], out=clamped[:, 2:])
+    return clamped
+
+
+def _as_array(img):
+    """View a PIL image or ndarray as an (H, W) or (H, W, C) uint8 array."""
+    if isinstance(img, np.ndarray):
+        return img
+    if img.mode not in ('L', 'RGB', 'RGBA'):
+        img = img.convert('RGB')
+    return np.asarray(img)
+
+
+def _content(arr, threshold):
+    """Mask of pixels darker than `threshold` in an (H, W[, C]) array."""
+    gray = arr if arr.ndim == 2 else luminance(arr)
+    return gray < threshold
+
+
+def _full_bbox(arr, threshold):
+    """Inclusive (left, top, right, bottom) of all content, or None."""
+    content = _content(arr, threshold)
+    rows = np.flatnonzero(content.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(content.any(axis=0))
+    return (cols[0], rows[0], cols[-1], rows[-1])
+
+
+def tight_bbox(pil_img, threshold=230, padding=8) -> tuple:
+    """
+    Find tight bounding box around keyboard content.
+
+    `pil_img` may be a PIL image or an RGB(A) NumPy array (e.g. a view into
+    the decoded source image). Returns (left, top, right, bottom) relative to
+    it, padded and clamped to the image. right/bottom are the last content
+    column/row plus the padding. If nothing is darker than `threshold`,
+    returns the full image.
+    """
+    arr = _as_array(pil_img)
+    height, width = arr.shape[:2]
+
+    if HAVE_NUMBA and height * width >= NUMBA_MIN_PIXELS:
+        left, top, right, bottom = bbox_scan(arr if arr.ndim == 3 else arr[:, :, None], threshold)
+        if top < 0:
+            return (0, 0, width, height)
+        return _pad_box(left, top, right, bottom, width, height, padding)
+
+    # Coarse pass over every COARSE_STEP-th pixel. Any content it finds lies
+    # inside the true box, so the exact edges can only be in the strips
+    # outside it; only those strips are scanned at full resolution.
+    step = COARSE_STEP
+    coarse = _content(arr[::step, ::step], threshold)
+    rows = np.flatnonzero(coarse.any(axis=1))
+    if rows.size == 0:
+        # Content (if any) slipped between the samples; scan everything
+        bbox = _full_bbox(arr, threshold)
+        if bbox is None:
+            # No content found, return full region
+            return (0, 0, width, height)
+        left, top, right, bottom = bbox
+    else:
+        cols = np.flatnonzero(coarse.any(axis=0))
+        top, bottom = rows[0] * step, rows[-1] * step
+        left, right = cols[0] * step, cols[-1] * step
+
+        hits = np.flatnonzero(_content(arr[:top], threshold).any(axis=1))
+        if hits.size:
+            top = hits[0]
+        hits = np.flatnonzero(_content(arr[bottom + 1:], threshold).any(axis=1))
+        if hits.size:
+            bottom += 1 + hits[-1]
+        hits = np.flatnonzero(_content(arr[:, :left], threshold).any(axis=0))
+        if hits.size:
+            left = hits[0]
+        hits = np.flatnonzero(_content(arr[:, right + 1:], threshold).any(axis=0))
+        if hits.size:
+            right += 1 + hits[-1]
+
+    return _pad_box(left, top, right, bottom, width, height, padding)
+
+
+def _pad_box(left, top, right, bottom, width, height, padding):
+    """Pad an inclusive content box for visual breathing room and clamp it."""
+    min_x = max(0, int(left) - padding)
+    min_y = max(0, int(top) - padding)
+    max_x = min(width, int(right) + padding)
+    max_y = min(height, int(bottom) + padding)
+
+    return (min_x, min_y, max_x, max_y)
+
+
+def bbox_cache_key(image_path, box, *params) -> str:
+    """
+    Cache key for the tight box of `box` in `image_path`.
+
+    The image is identified by path, mtime and size, so regenerating it
+    invalidates its entries; `params` are the detection settings
+    (threshold, padding, ...).
+    """
+    st = os.stat(image_path)
+    return f"{os.path.abspath(image_path)}|{st.st_mtime_ns}|{st.st_size}|{tuple(box)}|{params}"
+
+
+def _open_bbox_cache():
+    os.makedirs(os.path.dirname(BBOX_CACHE_FILE), exist_ok=True)
+    return shelve.open(BBOX_CACHE_FILE)
+
+
+def load_cached_bboxes(keys) -> dict:
+    """Return the cached tight boxes for whichever of `keys` are present."""
+    with _open_bbox_cache() as cache:
+        return {key: cache[key] for key in keys if key in cache}
+
+
+def store_cached_bboxes(entries) -> None:
+    """Persist a {key: tight box} mapping to BBOX_CACHE_FILE."""
+    if entries:
+        with _open_bbox_cache() as cache:
+            cache.update(entries)
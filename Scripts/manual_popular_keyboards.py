@@ -7,13 +7,19 @@ by being selective and using known paths.
 """
 
 import json
-import urllib.request
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 
+from qmk_cache import http_request
+
 BASE_URL = "https://raw.githubusercontent.com/qmk/qmk_firmware/master/keyboards"
 OUTPUT_FILE = "Sources/KeyPathAppKit/Resources/popular-keyboards.json"
 
+# Fetches are network-bound, so overlap them across threads. If the host does
+# throttle the burst, http_request backs off and retries (429, or 403 with the
+# quota used up) instead of the keyboard being dropped.
+MAX_WORKERS = 16
+
 # Manually curated list: (path, display_name)
 # These are keyboards we know exist and are popular
 CURATED_KEYBOARDS = [
@@ -128,14 +134,14 @@ def fetch_keyboard(keyboard_path: str, display_name: str) -> Dict[str, Any] | No
     """Fetch info.json for a keyboard."""
     url = f"{BASE_URL}/{keyboard_path}/info.json"
     try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            if response.status == 200:
-                data = json.loads(response.read())
-                return {
-                    "path": keyboard_path,
-                    "display_name": display_name,
-                    "info": data
-                }
+        status, _, body = http_request(url, timeout=5)
+        if status == 200:
+            data = json.loads(body)
+            return {
+                "path": keyboard_path,
+                "display_name": display_name,
+                "info": data
+            }
     except Exception as e:
         return None
     return None
@@ -146,25 +152,24 @@ def main():
     print(f"🔍 Fetching {len(CURATED_KEYBOARDS)} curated keyboards...")
     
     keyboards = []
-    for i, (keyboard_path, display_name) in enumerate(CURATED_KEYBOARDS, 1):
-        print(f"[{i}/{len(CURATED_KEYBOARDS)}] {keyboard_path}...", end=" ")
-        result = fetch_keyboard(keyboard_path, display_name)
-        if result:
-            keyboards.append(result)
-            print("✅")
-        else:
-            print("❌")
-        
-        # Small delay to avoid rate limits
-        if i % 10 == 0:
-            time.sleep(1)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # map() yields in submission order, so the bundle order is stable
+        results = executor.map(lambda kv: fetch_keyboard(*kv), CURATED_KEYBOARDS)
+        for i, ((keyboard_path, display_name), result) in enumerate(zip(CURATED_KEYBOARDS, results), 1):
+            print(f"[{i}/{len(CURATED_KEYBOARDS)}] {keyboard_path}...", end=" ")
+            if result:
+                keyboards.append(result)
+                print("✅")
+            else:
+                print("❌")
     
     output = {
         "version": "1.0",
         "keyboards": keyboards
     }
     
-    with open(OUTPUT_FILE, "w") as f:
+    # The bundle is checked in, so keep it indented for reviewable diffs
+    with open(OUTPUT_FILE, "w", buffering=1 << 20) as f:
         json.dump(output, f, indent=2)
     
     print(f"\n✅ Generated {OUTPUT_FILE}")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk HTTP cache for the QMK keyboard discovery scripts.
+
+Responses are stored in a shelve database keyed by URL together with their
+ETag. Later requests revalidate with If-None-Match, so a re-run mostly gets
+empty 304 responses back (which also don't count against GitHub's
+unauthenticated API rate limit).
+
+Requests go over keep-alive connections (one per host per thread), so
+repeated calls to raw.githubusercontent.com / api.github.com skip the TCP
+and TLS handshakes that urllib.request.urlopen pays on every call.
+"""
+
+import gzip
+import http.client
+import shelve
+import threading
+import time
+import urllib.error
+import urllib.parse
+from typing import Callable, Dict, Optional, Tuple
+
+CACHE_FILE = ".qmk_cache"
+PATHS_CACHE_FILE = ".qmk_cache_paths"
+
+# Negative lookups are retried after a day; found paths are kept until cleared
+MISS_TTL = 24 * 60 * 60
+
+# shelve is not safe for concurrent access; the scripts probe from threads
+_CACHE_LOCK = threading.Lock()
+
+# GitHub's API rejects requests without a User-Agent
+DEFAULT_HEADERS = {"User-Agent": "KeyPath/1.0", "Accept-Encoding": "gzip"}
+MAX_REDIRECTS = 5
+
+# Rate-limited (429, or 403 with the quota used up) requests are retried this
+# many times, waiting as the server asks but never longer than
+# RATE_LIMIT_MAX_WAIT seconds at a time
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_MAX_WAIT = 60
+
+# http.client connections are not thread-safe, so each thread keeps its own
+_LOCAL = threading.local()
+
+
+def _connection(host: str, timeout: float) -> http.client.HTTPSConnection:
+    """Return this thread's keep-alive connection to `host`."""
+    connections = _LOCAL.__dict__.setdefault("connections", {})
+    conn = connections.get(host)
+    if conn is None:
+        conn = http.client.HTTPSConnection(host, timeout=timeout)
+        connections[host] = conn
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_connection(host: str) -> None:
+    conn = _LOCAL.__dict__.get("connections", {}).pop(host, None)
+    if conn is not None:
+        conn.close()
+
+
+def _rate_limit_delay(response: http.client.HTTPResponse, retries: int) -> Optional[float]:
+    """Seconds to wait before retrying a rate-limited response, or None.
+
+    Honours Retry-After and GitHub's X-RateLimit-Reset. A 403 is only
+    treated as a rate limit when GitHub says the quota is used up, and a
+    wait longer than RATE_LIMIT_MAX_WAIT (e.g. the hourly API quota) isn't
+    worth blocking on, so both give None and the error propagates.
+    """
+    if response.status not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        delay = float(retry_after)
+    elif response.headers.get("X-RateLimit-Remaining") == "0":
+        delay = float(response.headers.get("X-RateLimit-Reset", 0)) - time.time()
+    elif response.status == 429:
+        delay = 2.0 ** retries
+    else:
+        return None
+    if delay > RATE_LIMIT_MAX_WAIT:
+        return None
+    return max(delay, 1.0)
+
+
+def http_request(
+    url: str,
+    timeout: float,
+    method: str = "GET",
+    headers: Optional[Dict[str, str]] = None,
+) -> Tuple[int, http.client.HTTPMessage, bytes]:
+    """Send a request over a pooled HTTPS connection.
+
+    Follows redirects and transparently un-gzips the body. Returns
+    (status, headers, body). Rate-limited responses are first retried with
+    a backoff (see _rate_limit_delay); any status >= 300 left after
+    redirects and retries raises urllib.error.HTTPError and network failures (DNS, refused connections,
+    timeouts, broken responses) raise urllib.error.URLError, just like
+    urllib.request.urlopen.
+    """
+    redirects = rate_limit_retries = 0
+    while True:
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        request_headers = {**DEFAULT_HEADERS, **(headers or {})}
+
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh one before giving up
+        for attempt in range(2):
+            conn = _connection(parts.netloc, timeout)
+            try:
+                conn.request(method, path, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError) as e:
+                _drop_connection(parts.netloc)
+                if attempt:
+                    raise urllib.error.URLError(e) from e
+            except OSError as e:
+                _drop_connection(parts.netloc)
+                raise urllib.error.URLError(e) from e
+
+        if response.will_close:
+            _drop_connection(parts.netloc)
+
+        location = response.headers.get("Location")
+        if response.status in (301, 302, 303, 307, 308) and location:
+            redirects += 1
+            if redirects > MAX_REDIRECTS:
+                raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, None)
+            url = urllib.parse.urljoin(url, location)
+            continue
+
+        # Back off and retry when rate limited, rather than letting a burst
+        # of concurrent requests silently drop keyboards
+        delay = _rate_limit_delay(response, rate_limit_retries)
+        if delay is not None and rate_limit_retries < RATE_LIMIT_RETRIES:
+            rate_limit_retries += 1
+            time.sleep(delay)
+            continue
+
+        if response.headers.get("Content-Encoding") == "gzip" and body:
+            body = gzip.decompress(body)
+        if response.status >= 300:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+        return response.status, response.headers, body
+
+
+def has_cached(url: str) -> bool:
+    """Return True if a response for `url` is already in the cache."""
+    with _CACHE_LOCK, shelve.open(CACHE_FILE) as cache:
+        return url in cache
+
+
+def cached_get(url: str, timeout: float) -> bytes:
+    """GET `url`, revalidating any cached copy with If-None-Match.
+
+    Returns the response body. HTTP errors other than 304 propagate as
+    urllib.error.HTTPError and network failures as urllib.error.URLError,
+    just like http_request.
+    """
+    with _CACHE_LOCK, shelve.open(CACHE_FILE) as cache:
+        cached = cache.get(url)
+
+    headers = {}
+    if cached is not None:
+        headers["If-None-Match"] = cached[0]
+
+    try:
+        _, response_headers, body = http_request(url, timeout, headers=headers)
+        etag = response_headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            return cached[1]
+        raise
+
+    if etag:
+        with _CACHE_LOCK, shelve.open(CACHE_FILE) as cache:
+            cache[url] = (etag, body)
+    return body
+
+
+def cached_lookup(key: str, lookup: Callable[[str], Optional[str]]) -> Optional[str]:
+    """Return `lookup(key)`, memoized on disk in PATHS_CACHE_FILE.
+
+    Results are stored with a timestamp. A `None` result is only trusted for
+    MISS_TTL seconds so keyboards that were missing (or failed to probe) get
+    retried on a later run.
+    """
+    with _CACHE_LOCK, shelve.open(PATHS_CACHE_FILE) as cache:
+        entry = cache.get(key)
+    if entry is not None:
+        stored_at, value = entry
+        if value is not None or time.time() - stored_at < MISS_TTL:
+            return value
+
+    value = lookup(key)
+    with _CACHE_LOCK, shelve.open(PATHS_CACHE_FILE) as cache:
+        cache[key] = (time.time(), value)
+    return value
@@ -6,47 +6,67 @@ This script isolates each keyboard individually with proper masking and cropping
 Usage:
 1. Run with --analyze to see image structure and get suggestions
 2. Manually identify keyboard regions using an image editor
-3. Update KEYBOARD_REGIONS with precise coordinates
+3. Update "keyboards" in slice_configs/designer.json with precise coordinates
 4. Run again to generate clean assets
 
-The script will:
+The slicing itself is done by slice_keyboards.py, which will:
 - Crop tightly around each keyboard
-- Remove text labels (heuristic-based)
 - Save isolated, clean keyboard images
 """
 
-from PIL import Image, ImageEnhance, ImageFilter, ImageDraw
+from PIL import Image
 import os
 import sys
 import argparse
+import json
 
-# Manual keyboard regions: (left, top, right, bottom) in pixels
-# These need to be set by visually inspecting the image
-# Format: layout_id: (x1, y1, x2, y2)
-KEYBOARD_REGIONS = {
-    # Tier 1 (left column, top to bottom)
-    "macbook-us": (50, 50, 450, 250),      # Approximate - needs adjustment
-    "kinesis-360": (50, 280, 450, 480),    # Approximate - needs adjustment
-    
-    # ANSI sizes (middle column, top to bottom)
-    "ansi-40": (500, 50, 900, 200),        # Approximate - needs adjustment
-    "ansi-60": (500, 220, 900, 370),       # Approximate - needs adjustment
-    "ansi-65": (500, 390, 900, 540),       # Approximate - needs adjustment
-    "ansi-75": None,  # Not visible in current crop
-    "ansi-80": None,
-    "ansi-100": None,
-    
-    # Custom configs (right column, top to bottom)
-    "hhkb": None,
-    "corne": None,
-    "sofle": None,
-    "ferris-sweep": None,
-    "cornix": None,
-}
+# slice_keyboards (and with it NumPy) is only imported to slice, so
+# --analyze still works without NumPy
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slice_configs", "designer.json")
 
-def analyze_image_structure(img_path):
-    """Analyze the image and suggest keyboard regions."""
-    img = Image.open(img_path)
+def count_regions(mask):
+    """
+    Count 4-connected components in a boolean mask.
+    Uses scipy's ndimage.label when available, otherwise a raster-scan
+    union-find over the mask.
+    """
+    try:
+        from scipy import ndimage
+        return ndimage.label(mask)[1]
+    except ImportError:
+        pass
+    
+    rows = mask.tolist()
+    width = mask.shape[1]
+    parent = {}
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+    
+    for y, row in enumerate(rows):
+        above = rows[y - 1] if y else None
+        for x, on in enumerate(row):
+            if not on:
+                continue
+            i = y * width + x
+            parent[i] = i
+            if x and row[x - 1]:
+                union(i - 1, i)
+            if above and above[x]:
+                union(i - width, i)
+    
+    return sum(1 for i in parent if find(i) == i)
+
+def analyze_image_structure(img):
+    """Analyze the (already opened) image and suggest keyboard regions."""
     width, height = img.size
     
     print(f"\n📐 Image Analysis")
@@ -58,15 +78,15 @@ def analyze_image_structure(img_path):
     
     # Detect potential keyboard regions by looking for darker areas
     # (keyboards are typically darker than white backgrounds)
-    gray_array = np.array(gray)
+    gray_array = np.asarray(gray)
     
-    # Threshold to find non-white areas
+    # Threshold to find non-white areas; keyboards are large, so a 4x
+    # downsampled mask is plenty to count them
     threshold = 200
-    mask = gray_array < threshold
+    mask = gray_array[::4, ::4] < threshold
     
-    # Find bounding boxes of connected components
-    from scipy import ndimage
-    labeled, num_features = ndimage.label(mask)
+    # Count connected components
+    num_features = count_regions(mask)
     
     print(f"\n🔍 Found {num_features} potential regions")
     print("\nSuggested approach:")
@@ -74,142 +94,44 @@ def analyze_image_structure(img_path):
     print("2. For each keyboard, note the pixel coordinates:")
     print("   - Top-left corner (x, y)")
     print("   - Bottom-right corner (x, y)")
-    print("3. Update KEYBOARD_REGIONS in this script")
+    print(f"3. Update \"keyboards\" in {CONFIG_PATH}")
     print("\nTip: Use Preview's Inspector (⌘I) to see pixel coordinates")
 
-def find_keyboard_bounds(img_region):
-    """
-    Find tight bounds around a keyboard within a region.
-    Uses edge detection and content analysis.
-    """
-    import numpy as np
-    
-    # Convert to grayscale
-    gray = img_region.convert('L')
-    gray_array = np.array(gray)
-    
-    # Find rows/columns with significant content (not pure white)
-    # Use a threshold to distinguish keyboard from background
-    threshold = 240  # Slightly below white (255)
-    
-    # Find content bounds
-    rows_with_content = np.any(gray_array < threshold, axis=1)
-    cols_with_content = np.any(gray_array < threshold, axis=0)
-    
-    if not np.any(rows_with_content) or not np.any(cols_with_content):
-        # No content detected, return full region
-        return (0, 0, img_region.width, img_region.height)
-    
-    # Find bounds
-    top = np.argmax(rows_with_content)
-    bottom = len(rows_with_content) - np.argmax(rows_with_content[::-1])
-    left = np.argmax(cols_with_content)
-    right = len(cols_with_content) - np.argmax(cols_with_content[::-1])
-    
-    # Add small padding for visual breathing room
-    padding = 5
-    top = max(0, top - padding)
-    left = max(0, left - padding)
-    bottom = min(img_region.height, bottom + padding)
-    right = min(img_region.width, right + padding)
-    
-    return (left, top, right, bottom)
-
-def remove_text_heuristic(img):
-    """
-    Heuristic approach to remove text labels.
-    This is imperfect - manual cropping should avoid text areas.
-    """
-    # For now, return original
-    # In a production tool, you might use OCR to detect and remove text
-    return img
-
-def isolate_keyboard(input_path, output_dir, layout_id, region):
-    """
-    Isolate a single keyboard from the composite image.
-    """
-    img = Image.open(input_path)
-    width, height = img.size
-    
-    if region is None:
-        print(f"⚠️  Skipping {layout_id} (no region specified)")
-        return
-    
-    x1, y1, x2, y2 = region
-    
-    # Validate bounds
-    x1 = max(0, min(x1, width))
-    y1 = max(0, min(y1, height))
-    x2 = max(x1, min(x2, width))
-    y2 = max(y1, min(y2, height))
-    
-    if x2 <= x1 or y2 <= y1:
-        print(f"⚠️  Invalid bounds for {layout_id}: {region}")
-        return
-    
-    # Crop the approximate region
-    region_img = img.crop((x1, y1, x2, y2))
-    
-    # Find tight bounds around the keyboard
-    tight_bounds = find_keyboard_bounds(region_img)
-    left, top, right, bottom = tight_bounds
-    
-    # Crop to tight bounds
-    keyboard = region_img.crop((left, top, right, bottom))
-    
-    # Try to remove text (heuristic)
-    keyboard = remove_text_heuristic(keyboard)
-    
-    # Save
-    output_path = os.path.join(output_dir, f"{layout_id}.png")
-    keyboard.save(output_path, "PNG", optimize=True)
-    
-    print(f"✓ {layout_id:20s} -> {output_path}")
-    print(f"  Cropped from ({x1+left}, {y1+top}) to ({x1+right}, {y1+bottom})")
-    print(f"  Size: {keyboard.size[0]}x{keyboard.size[1]} pixels")
-
 def main():
     parser = argparse.ArgumentParser(description='Slice keyboard images with designer precision')
     parser.add_argument('--analyze', action='store_true', help='Analyze image structure')
-    parser.add_argument('--input', default='/Users/malpern/.cursor/projects/Users-malpern-local-code-KeyPath/assets/image-46a51a28-6b48-4eee-bd37-f72062d180f3.png',
-                        help='Input image path')
-    parser.add_argument('--output', default='/Users/malpern/local-code/KeyPath/Sources/KeyPathAppKit/Resources/KeyboardIllustrations',
-                        help='Output directory')
+    parser.add_argument('--input', help=f'Input image path (default: "input" in {CONFIG_PATH})')
+    parser.add_argument('--output', help=f'Output directory (default: "output" in {CONFIG_PATH})')
     
     args = parser.parse_args()
     
-    if not os.path.exists(args.input):
-        print(f"❌ Image not found: {args.input}")
+    with open(CONFIG_PATH) as f:
+        config = json.load(f)
+    if args.input:
+        config['input'] = args.input
+    if args.output:
+        config['output'] = args.output
+    
+    if not os.path.exists(config['input']):
+        print(f"❌ Image not found: {config['input']}")
         sys.exit(1)
     
     if args.analyze:
-        try:
-            import numpy as np
-            from scipy import ndimage
-            analyze_image_structure(args.input)
-        except ImportError:
-            print("⚠️  scipy not available, using basic analysis")
-            img = Image.open(args.input)
+        img = Image.open(config['input'])
+        if np is not None:
+            analyze_image_structure(img)
+        else:
+            print("⚠️  numpy not available, using basic analysis")
             print(f"\n📐 Image Analysis")
             print(f"   Size: {img.size[0]}x{img.size[1]} pixels")
             print(f"   Mode: {img.mode}")
             print("\nTo set up keyboard regions:")
             print("1. Open the image in Preview (⌘I to show coordinates)")
             print("2. For each keyboard, note top-left and bottom-right coordinates")
-            print("3. Update KEYBOARD_REGIONS in this script")
+            print(f"3. Update \"keyboards\" in {CONFIG_PATH}")
     else:
-        os.makedirs(args.output, exist_ok=True)
-        
-        print("🎨 Isolating keyboards...\n")
-        count = 0
-        for layout_id, region in KEYBOARD_REGIONS.items():
-            if region is not None:
-                isolate_keyboard(args.input, args.output, layout_id, region)
-                count += 1
-            else:
-                print(f"⚠️  Skipping {layout_id} (no region specified)")
-        
-        print(f"\n✅ Processed {count} keyboards")
+        import slice_keyboards
+        sys.exit(slice_keyboards.slice_all([config]))
 
 if __name__ == "__main__":
     try:
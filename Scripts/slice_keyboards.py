@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Config-driven keyboard image slicer.
+
+One driver for the slicing done by the coordinate-driven per-image scripts
+(slice_keyboards_final.py, slice_keyboards_precise.py,
+slice_keyboard_images_improved.py and slice_keyboard_images_designer.py,
+which are thin wrappers running their config from slice_configs/): each
+config file names a source image and the keyboard coordinates to cut from
+it, and every config passed on the command line is processed in a single
+run. Each distinct source image is decoded once and every keyboard is
+sliced out of it as a NumPy view.
+
+slice_keyboard_images.py and slice_keyboards_smart.py derive their boxes
+from a grid over the image rather than fixed coordinates, so they stay
+separate.
+
+Config format (JSON, either one object or a list of them):
+
+    {
+        "input": "/path/to/composite.png",
+        "output": "/path/to/KeyboardIllustrations",
+        "threshold": 240,       # optional, content is darker than this
+        "padding": 10,          # optional, breathing room around content
+        "tighten": true,        # optional, false saves the box as-is
+        "keyboards": {
+            "macbook-us": [48, 99, 443, 243],
+            "ansi-75": null     # skipped
+        }
+    }
+
+Coordinates are always in source-image pixels. With --scale the source is
+downsampled once before slicing (e.g. 0.5 to emit @1x assets from an @2x
+master) and the boxes are scaled to match.
+
+--format webp writes lossy WebP (much smaller and faster to encode) instead
+of PNG. The app currently bundles .png illustrations, so PNG stays the
+default.
+
+Configs live in slice_configs/, one per wrapper script.
+
+Usage:
+    python3 slice_keyboards.py --coords slice_configs/final.json
+    python3 slice_keyboards.py --coords slice_configs/final.json --scale 0.5
+    python3 slice_keyboards.py --coords slice_configs/final.json --format webp
+"""
+
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from keyboard_bounds import (
+    bbox_cache_key, clamp_boxes, load_cached_bboxes, store_cached_bboxes, tight_bbox,
+)
+
+# Checked-in configs for the per-image slicer scripts
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'slice_configs')
+
+PNG_COMPRESS_LEVEL = 6
+
+# Output formats: file extension and Pillow save arguments
+OUTPUT_FORMATS = {
+    'png': ('.png', {'format': 'PNG', 'compress_level': PNG_COMPRESS_LEVEL}),
+    'webp': ('.webp', {'format': 'WEBP', 'quality': 92, 'method': 4}),
+}
+
+# The encoders release the GIL, so a few threads overlap the encodes
+# without shipping arrays to worker processes
+SAVE_WORKERS = 4
+
+
+def load_configs(paths):
+    """Load every config file, flattening files that hold a list of configs."""
+    configs = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        configs.extend(data if isinstance(data, list) else [data])
+    return configs
+
+
+def decode(path, scale=1.0):
+    """
+    Decode an image to an (H, W, C) uint8 array, keeping alpha if present.
+    With scale < 1 the image is downsampled once here, so every later crop,
+    bounds search and encode works on the smaller image.
+    """
+    img = Image.open(path)
+    if scale < 1:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+    return np.asarray(img.convert('RGBA' if 'A' in img.getbands() else 'RGB'))
+
+
+def save_crop(item):
+    """Save one (output_path, pixel array, save kwargs) crop."""
+    output_path, crop, save_args = item
+    Image.fromarray(crop).save(output_path, **save_args)
+
+
+def slice_config(config, arr, scale=1.0, fmt='png'):
+    """
+    Slice every keyboard in one config out of its decoded source array.
+    `scale` is the factor `arr` was downsampled by relative to the config's
+    coordinates; `fmt` is a key of OUTPUT_FORMATS.
+    """
+    extension, save_args = OUTPUT_FORMATS[fmt]
+    output_dir = config['output']
+    threshold = config.get('threshold', 240)
+    padding = config.get('padding', 10)
+    tighten = config.get('tighten', True)
+
+    keyboards = config['keyboards']
+    layout_ids = [k for k, v in keyboards.items() if v is not None]
+    for k, v in keyboards.items():
+        if v is None:
+            print(f"⚠️  Skipping {k} (no coordinates)")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    height, width = arr.shape[:2]
+    boxes = [keyboards[k] for k in layout_ids]
+    if scale != 1:
+        boxes = np.rint(np.array(boxes, dtype=np.float64).reshape(-1, 4) * scale)
+    boxes = clamp_boxes(boxes, width, height).tolist()
+
+    # Reuse tight bounds found by earlier runs on this same image
+    keys = {}
+    cached = {}
+    if tighten:
+        keys = {k: bbox_cache_key(config['input'], box, threshold, padding, scale)
+                for k, box in zip(layout_ids, boxes)}
+        cached = load_cached_bboxes(keys.values())
+    found = {}
+
+    crops = []
+    for layout_id, (x1, y1, x2, y2) in zip(layout_ids, boxes):
+        if x2 <= x1 or y2 <= y1:
+            print(f"⚠️  Invalid coordinates for {layout_id}: {keyboards[layout_id]}")
+            continue
+
+        if tighten:
+            key = keys[layout_id]
+            if key not in cached:
+                found[key] = tight_bbox(arr[y1:y2, x1:x2], threshold=threshold, padding=padding)
+            left, top, right, bottom = cached.get(key) or found[key]
+            x1, y1, x2, y2 = x1 + left, y1 + top, x1 + right, y1 + bottom
+
+        crops.append((layout_id, os.path.join(output_dir, f"{layout_id}{extension}"), arr[y1:y2, x1:x2]))
+
+    with ThreadPoolExecutor(max_workers=SAVE_WORKERS) as executor:
+        list(executor.map(save_crop, [(path, crop, save_args) for _, path, crop in crops]))
+    store_cached_bboxes(found)
+
+    for layout_id, _, crop in crops:
+        print(f"✓ {layout_id:20s} -> {crop.shape[1]}x{crop.shape[0]} pixels")
+
+    return len(crops)
+
+
+def slice_all(configs, scale=1.0, fmt='png'):
+    """
+    Slice every config in one run and print a summary; returns the exit
+    status. Configs that share a source image share its decoded array.
+    """
+    decoded = {}
+    total = 0
+    for config in configs:
+        input_path = config['input']
+        if not os.path.exists(input_path):
+            print(f"❌ Image not found: {input_path}")
+            continue
+        if input_path not in decoded:
+            decoded[input_path] = decode(input_path, scale)
+            h, w = decoded[input_path].shape[:2]
+            print(f"📐 {input_path}: {w}x{h} pixels\n")
+
+        print(f"🎨 Isolating keyboards into {config['output']}...\n")
+        total += slice_config(config, decoded[input_path], scale, fmt)
+        print()
+
+    print(f"✅ Processed {total} keyboards from {len(decoded)} image(s)")
+    return 0 if decoded else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Slice keyboard images from one or more coordinate configs')
+    parser.add_argument('--coords', action='append', required=True, metavar='CONFIG',
+                        help='JSON config naming the input image and keyboard coordinates (repeatable)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Downsample each source by this factor (0 < scale <= 1) before slicing')
+    parser.add_argument('--format', choices=sorted(OUTPUT_FORMATS), default='png',
+                        help='Output image format (default: png)')
+    parser.add_argument('--allow-large-images', action='store_true',
+                        help="Disable Pillow's decompression-bomb pixel limit for very large sources")
+    args = parser.parse_args(argv)
+
+    if not 0 < args.scale <= 1:
+        parser.error("--scale must be in (0, 1]")
+    if args.allow_large_images:
+        Image.MAX_IMAGE_PIXELS = None
+
+    return slice_all(load_configs(args.coords), args.scale, args.format)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,87 +3,27 @@
 Precise keyboard image slicer with manual coordinate refinement.
 
 This script uses a combination of:
-1. Image analysis to detect keyboard regions
-2. Manual coordinate refinement for precision
-3. Tight cropping to isolate each keyboard
+1. A grid helper image to read off keyboard coordinates
+2. Manual coordinates in slice_configs/precise.json
+3. Tight cropping to isolate each keyboard (slice_keyboards.py does the
+   slicing; extra flags such as --scale or --format are passed through)
 
 The image is 2048x661 pixels with keyboards arranged in a grid.
 """
 
-from PIL import Image, ImageEnhance
+from PIL import Image
 import os
+import sys
 
-IMAGE_WIDTH = 2048
-IMAGE_HEIGHT = 661
+import slice_keyboards
 
-# Manual keyboard coordinates: (left, top, right, bottom)
-# These should be set by visually inspecting the image
-# Format: layout_id: (x1, y1, x2, y2)
-KEYBOARD_COORDS = {
-    # Left column - Tier 1
-    "macbook-us": None,      # Needs manual setting
-    "kinesis-360": None,     # Needs manual setting
-    
-    # Middle column - ANSI sizes
-    "ansi-40": None,
-    "ansi-60": None,
-    "ansi-65": None,
-    "ansi-75": None,
-    "ansi-80": None,
-    "ansi-100": None,
-    
-    # Right column - Custom configs
-    "hhkb": None,
-    "corne": None,
-    "sofle": None,
-    "ferris-sweep": None,
-    "cornix": None,
-}
-
-def find_tight_bounds(img_region):
-    """
-    Find tight bounding box around keyboard content.
-    Removes white space and text areas.
-    """
-    # Convert to grayscale
-    gray = img_region.convert('L')
-    pixels = gray.load()
-    width, height = gray.size
-    
-    # Find content bounds (non-white areas)
-    # Use a threshold to distinguish keyboard from white background
-    threshold = 230  # Adjust based on image contrast
-    
-    min_x, min_y = width, height
-    max_x, max_y = 0, 0
-    
-    # Scan for content
-    for y in range(height):
-        for x in range(width):
-            if pixels[x, y] < threshold:
-                min_x = min(min_x, x)
-                min_y = min(min_y, y)
-                max_x = max(max_x, x)
-                max_y = max(max_y, y)
-    
-    if max_x < min_x or max_y < min_y:
-        # No content found, return full region
-        return (0, 0, width, height)
-    
-    # Add small padding for visual breathing room
-    padding = 8
-    min_x = max(0, min_x - padding)
-    min_y = max(0, min_y - padding)
-    max_x = min(width, max_x + padding)
-    max_y = min(height, max_y + padding)
-    
-    return (min_x, min_y, max_x, max_y)
+CONFIG_PATH = os.path.join(slice_keyboards.CONFIG_DIR, "precise.json")
+HELPER_PATH = "/tmp/keyboard_grid_helper.png"
 
-def create_coordinate_helper(input_path, output_path):
+def create_coordinate_helper(img, output_path):
     """
     Create a helper image with grid overlay to assist in coordinate identification.
     """
-    img = Image.open(input_path)
     width, height = img.size
     
     # Create overlay with grid
@@ -119,73 +59,32 @@ def create_coordinate_helper(input_path, output_path):
     print(f"📐 Grid helper saved to: {output_path}")
     print("   Use this to identify precise coordinates for each keyboard")
 
-def isolate_keyboard(input_path, output_dir, layout_id, coords):
-    """Isolate a keyboard using precise coordinates."""
-    img = Image.open(input_path)
-    
-    if coords is None:
-        print(f"⚠️  Skipping {layout_id} (no coordinates)")
-        return
-    
-    x1, y1, x2, y2 = coords
-    
-    # Validate bounds
-    x1 = max(0, min(x1, img.width))
-    y1 = max(0, min(y1, img.height))
-    x2 = max(x1, min(x2, img.width))
-    y2 = max(y1, min(y2, img.height))
-    
-    # Crop approximate region
-    region = img.crop((x1, y1, x2, y2))
-    
-    # Find tight bounds
-    tight = find_tight_bounds(region)
-    left, top, right, bottom = tight
-    
-    # Crop to tight bounds
-    keyboard = region.crop((left, top, right, bottom))
-    
-    # Save
-    output_path = os.path.join(output_dir, f"{layout_id}.png")
-    keyboard.save(output_path, "PNG", optimize=True)
-    
-    print(f"✓ {layout_id:20s} -> {keyboard.size[0]}x{keyboard.size[1]}")
-
-def main():
-    input_path = "/Users/malpern/.cursor/projects/Users-malpern-local-code-KeyPath/assets/image-46a51a28-6b48-4eee-bd37-f72062d180f3.png"
-    output_dir = "/Users/malpern/local-code/KeyPath/Sources/KeyPathAppKit/Resources/KeyboardIllustrations"
+def main(argv=None):
+    config = slice_keyboards.load_configs([CONFIG_PATH])[0]
+    input_path = config['input']
     
     if not os.path.exists(input_path):
         print(f"❌ Image not found: {input_path}")
-        return
+        return 1
     
     # Create grid helper
-    helper_path = "/tmp/keyboard_grid_helper.png"
-    create_coordinate_helper(input_path, helper_path)
+    create_coordinate_helper(Image.open(input_path), HELPER_PATH)
     
     # Check if coordinates are set
-    if all(c is None for c in KEYBOARD_COORDS.values()):
+    if all(c is None for c in config['keyboards'].values()):
         print("\n⚠️  No keyboard coordinates set!")
         print("\nTo set coordinates:")
-        print("1. Open the grid helper image: open /tmp/keyboard_grid_helper.png")
+        print(f"1. Open the grid helper image: open {HELPER_PATH}")
         print("2. For each keyboard, identify:")
         print("   - Top-left corner (x, y)")
         print("   - Bottom-right corner (x, y)")
-        print("3. Update KEYBOARD_COORDS in this script")
+        print(f"3. Update \"keyboards\" in {CONFIG_PATH}")
         print("\nExample:")
-        print('   "macbook-us": (50, 30, 450, 200),')
-        return
-    
-    os.makedirs(output_dir, exist_ok=True)
-    
-    print("\n🎨 Isolating keyboards...\n")
-    count = 0
-    for layout_id, coords in KEYBOARD_COORDS.items():
-        if coords is not None:
-            isolate_keyboard(input_path, output_dir, layout_id, coords)
-            count += 1
+        print('   "macbook-us": [50, 30, 450, 200],')
+        return 0
     
-    print(f"\n✅ Processed {count} keyboards")
+    print()
+    return slice_keyboards.main(["--coords", CONFIG_PATH, *(sys.argv[1:] if argv is None else argv)])
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
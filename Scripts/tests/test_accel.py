@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+import Scripts  # noqa: F401  (puts Scripts/ on sys.path)
+
+# Imported under the same module name the scripts use, which keeps Numba's
+# kernel cache valid
+from _accel import _flood_fill_bg_bfs, flood_fill_bg
+
+# The uncompiled kernel, as written for Numba
+flood_fill_kernel = getattr(flood_fill_bg, "py_func", flood_fill_bg)
+
+
+class FloodFillTests(unittest.TestCase):
+    def test_bfs_fallback_matches_kernel(self):
+        rng = np.random.default_rng(3)
+        for trial in range(25):
+            height, width = (int(v) for v in rng.integers(1, 40, 2))
+            arr = np.full((height, width, 3), 240, dtype=np.uint8)
+            noise = rng.random((height, width)) < rng.random()
+            arr[noise] = rng.integers(0, 256, (int(noise.sum()), 3))
+
+            expected = np.full((height, width), 255, dtype=np.uint8)
+            actual = expected.copy()
+            flood_fill_kernel(arr, 240, 240, 240, 25 * 25, expected)
+            _flood_fill_bg_bfs(arr, 240, 240, 240, 25 * 25, actual)
+            np.testing.assert_array_equal(actual, expected, err_msg=f"trial {trial}")
+
+    def test_enclosed_background_stays_opaque(self):
+        arr = np.full((9, 9, 3), 255, dtype=np.uint8)
+        arr[2:7, 2:7] = 0
+        arr[4, 4] = 255
+        alpha = np.full((9, 9), 255, dtype=np.uint8)
+        _flood_fill_bg_bfs(arr, 255, 255, 255, 0, alpha)
+        self.assertEqual(alpha[0, 0], 0)
+        self.assertEqual(alpha[4, 4], 255)
+        self.assertTrue((alpha[2:7, 2:7] == 255).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import socket
+import tempfile
+import unittest
+from unittest import mock
+
+from Scripts.generate_popular_keyboards import fetch_info_json_dirs, fetch_keyboard_info
+
+# generate_popular_keyboards imports qmk_cache as a top-level module
+import qmk_cache
+
+
+class UnreachableConnection:
+    """Stands in for an HTTPSConnection whose host can't be resolved."""
+
+    sock = None
+
+    def request(self, *args, **kwargs):
+        raise socket.gaierror(-2, "Name or service not known")
+
+    def close(self):
+        pass
+
+
+class GeneratePopularKeyboardsTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for patcher in (
+            mock.patch.object(qmk_cache, "CACHE_FILE", os.path.join(tmp.name, "cache")),
+            mock.patch.object(qmk_cache, "_connection", return_value=UnreachableConnection()),
+            mock.patch("builtins.print"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_tree_listing_falls_back_to_probing_on_network_errors(self):
+        self.assertIsNone(fetch_info_json_dirs())
+
+    def test_keyboard_is_skipped_on_network_errors(self):
+        self.assertIsNone(fetch_keyboard_info("crkbd", "Corne (crkbd)", {"crkbd"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
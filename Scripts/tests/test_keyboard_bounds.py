@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from Scripts import keyboard_bounds
+from Scripts.keyboard_bounds import bbox_scan, luminance, tight_bbox
+
+# The uncompiled kernel, as it runs when Numba isn't installed
+bbox_scan_python = getattr(bbox_scan, "py_func", bbox_scan)
+
+
+def reference_bbox(arr, threshold):
+    """Inclusive content box by checking every pixel's Pillow luma, or None."""
+    gray = np.asarray(Image.fromarray(arr).convert("L"))
+    points = [(x, y) for y in range(gray.shape[0]) for x in range(gray.shape[1]) if gray[y, x] < threshold]
+    if not points:
+        return None
+    xs, ys = zip(*points)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def reference_tight_bbox(arr, threshold, padding):
+    height, width = arr.shape[:2]
+    box = reference_bbox(arr, threshold)
+    if box is None:
+        return (0, 0, width, height)
+    left, top, right, bottom = box
+    return (max(0, left - padding), max(0, top - padding),
+            min(width, right + padding), min(height, bottom + padding))
+
+
+def make_images():
+    """Blank, single-pixel and random-speckle RGB images on white."""
+    rng = np.random.default_rng(7)
+    blank = np.full((37, 53, 3), 255, dtype=np.uint8)
+
+    one_pixel = blank.copy()
+    one_pixel[20, 31] = (10, 200, 30)
+
+    corner = blank.copy()
+    corner[0, 0] = 0
+
+    speckled = blank.copy()
+    for _ in range(5):
+        speckled[rng.integers(0, 37), rng.integers(0, 53)] = rng.integers(0, 255, 3)
+
+    # Luma right at the threshold, just above and just below it
+    edge = blank.copy()
+    edge[3, 4] = 230
+    edge[30, 40] = 229
+    edge[10, 50] = 231
+
+    return {"blank": blank, "one_pixel": one_pixel, "corner": corner, "speckled": speckled, "edge": edge}
+
+
+class KeyboardBoundsTests(unittest.TestCase):
+    def test_luminance_matches_pillow(self):
+        arr = np.random.default_rng(1).integers(0, 256, (16, 16, 3), dtype=np.uint8)
+        np.testing.assert_array_equal(luminance(arr), np.asarray(Image.fromarray(arr).convert("L")))
+
+    def test_bbox_scan_matches_reference(self):
+        for name, arr in make_images().items():
+            for kernel in (bbox_scan, bbox_scan_python):
+                with self.subTest(image=name, kernel=kernel.__name__):
+                    expected = reference_bbox(arr, 230) or (-1, -1, -1, -1)
+                    self.assertEqual(tuple(int(v) for v in kernel(arr, 230)), expected)
+
+    def test_bbox_scan_grayscale(self):
+        gray = np.full((9, 11, 1), 255, dtype=np.uint8)
+        self.assertEqual(tuple(bbox_scan_python(gray, 200)), (-1, -1, -1, -1))
+        gray[4, 7, 0] = 199
+        self.assertEqual(tuple(bbox_scan_python(gray, 200)), (7, 4, 7, 4))
+
+    def test_tight_bbox_matches_reference(self):
+        for name, arr in make_images().items():
+            expected = reference_tight_bbox(arr, 230, 8)
+            with self.subTest(image=name, path="numpy"), \
+                 mock.patch.object(keyboard_bounds, "HAVE_NUMBA", False):
+                self.assertEqual(tight_bbox(arr, threshold=230, padding=8), expected)
+            with self.subTest(image=name, path="bbox_scan"), \
+                 mock.patch.object(keyboard_bounds, "HAVE_NUMBA", True), \
+                 mock.patch.object(keyboard_bounds, "NUMBA_MIN_PIXELS", 0), \
+                 mock.patch.object(keyboard_bounds, "bbox_scan", bbox_scan_python):
+                self.assertEqual(tight_bbox(arr, threshold=230, padding=8), expected)
+
+    def test_tight_bbox_accepts_pil_images(self):
+        arr = make_images()["one_pixel"]
+        self.assertEqual(tight_bbox(Image.fromarray(arr), threshold=230, padding=8),
+                         reference_tight_bbox(arr, 230, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import urllib.error
+from email.message import Message
+from unittest import mock
+
+import Scripts  # noqa: F401  (puts Scripts/ on sys.path)
+
+# Imported under the same module name the scripts use
+import qmk_cache
+
+
+class FakeResponse:
+    reason = "Fake"
+    will_close = False
+
+    def __init__(self, status, headers=None, body=b""):
+        self.status = status
+        self.headers = Message()
+        for name, value in (headers or {}).items():
+            self.headers[name] = value
+        self.body = body
+
+    def read(self):
+        return self.body
+
+
+class FakeConnection:
+    """Serves the queued responses in order."""
+
+    sock = None
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def request(self, *args, **kwargs):
+        pass
+
+    def getresponse(self):
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+class HttpRequestRateLimitTests(unittest.TestCase):
+    def request(self, *responses):
+        conn = FakeConnection(responses)
+        with mock.patch.object(qmk_cache, "_connection", return_value=conn), \
+             mock.patch.object(qmk_cache.time, "sleep") as sleep:
+            try:
+                return qmk_cache.http_request("https://example.com/info.json", timeout=5), sleep
+            finally:
+                self.remaining = len(conn.responses)
+
+    def test_retries_429_after_retry_after(self):
+        (status, _, body), sleep = self.request(
+            FakeResponse(429, {"Retry-After": "2"}),
+            FakeResponse(200, body=b"{}"),
+        )
+        self.assertEqual((status, body), (200, b"{}"))
+        sleep.assert_called_once_with(2.0)
+
+    def test_retries_403_when_github_quota_is_exhausted(self):
+        with mock.patch.object(qmk_cache.time, "time", return_value=1000.0):
+            (status, _, _), sleep = self.request(
+                FakeResponse(403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1005"}),
+                FakeResponse(200),
+            )
+        self.assertEqual(status, 200)
+        sleep.assert_called_once_with(5.0)
+
+    def test_plain_403_is_not_retried(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.request(FakeResponse(403), FakeResponse(200))
+        self.assertEqual(raised.exception.code, 403)
+        self.assertEqual(self.remaining, 1)
+
+    def test_gives_up_after_the_retry_budget(self):
+        responses = [FakeResponse(429) for _ in range(qmk_cache.RATE_LIMIT_RETRIES + 1)]
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.request(*responses)
+        self.assertEqual(raised.exception.code, 429)
+
+    def test_long_waits_are_not_blocked_on(self):
+        with self.assertRaises(urllib.error.HTTPError):
+            self.request(FakeResponse(429, {"Retry-After": "3600"}), FakeResponse(200))
+        self.assertEqual(self.remaining, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+from PIL import Image, ImageEnhance
+
+from Scripts.slice_keyboards_smart import contrast_cutoff
+
+
+PIXELS = np.arange(256)
+
+
+def enhanced_below(threshold, pixel_sum, count):
+    """
+    The original test for every pixel value: stretch by 1.5x about the
+    rounded mean, clamp and truncate to 8 bits, then compare.
+    """
+    mean = int(pixel_sum / count + 0.5)
+    out = np.clip(mean + 1.5 * (PIXELS - mean), 0, 255).astype(np.uint8)
+    return out < threshold
+
+
+class ContrastCutoffTests(unittest.TestCase):
+    def test_matches_float_comparison_for_every_sum(self):
+        # Small counts hit every fractional mean, including the .5 rounding
+        # boundaries
+        for count in (1, 2, 3, 4, 7):
+            for pixel_sum in range(255 * count + 1):
+                for threshold in (128, 200, 240, 255):
+                    cutoff = contrast_cutoff(threshold, pixel_sum, count)
+                    np.testing.assert_array_equal(
+                        PIXELS < cutoff, enhanced_below(threshold, pixel_sum, count),
+                        err_msg=f"threshold={threshold} sum={pixel_sum} count={count}",
+                    )
+
+    def test_matches_image_enhance(self):
+        ramp = np.arange(256, dtype=np.uint8)
+        for fill in (0, 37, 128, 200, 255):
+            # The ramp plus filler, so the mean covers a range of values
+            gray = np.concatenate([ramp, np.full(256, fill, dtype=np.uint8)]).reshape(2, 256)
+            img = Image.fromarray(gray)
+            enhanced = np.asarray(ImageEnhance.Contrast(img).enhance(1.5))
+            for threshold in (200, 240):
+                with self.subTest(fill=fill, threshold=threshold):
+                    cutoff = contrast_cutoff(threshold, int(gray.sum()), gray.size)
+                    np.testing.assert_array_equal(gray < cutoff, enhanced < threshold)
+
+
+if __name__ == "__main__":
+    unittest.main()